@@ -1,149 +1,200 @@
 """The Easyplus Apex System integration."""
 import asyncio
 import logging
-import re
-import xml.etree.ElementTree as ET
+import time
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.const import Platform
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
 from .const import (
-    DOMAIN, CONF_HOST, CONF_PORT, 
-    CONF_XML_CONTENT, CONF_COVERS, CONF_NAMING_MAP, 
-    CONF_XML_SWITCHES, CONF_XML_DIMMERS,
-    CONF_COVER_NAME, CONF_ADDR_DIR, CONF_ADDR_POWER, 
-    CONF_TRAVEL_TIME, CONF_STRICT_MODE
+    DOMAIN, CONF_HOST, CONF_PORT,
+    CONF_XML_CONTENT, CONF_STRICT_MODE, CONF_COVERS,
+    CONF_XML_SWITCHES, CONF_XML_DIMMERS, CONF_XML_INPUTS, CONF_OUTPUT_STATISTICS,
+    CONF_INSTANT_DISCOVERY, DEFAULT_INSTANT_DISCOVERY,
+    CONF_STARTUP_PRIORITY, DEFAULT_STARTUP_PRIORITY,
+    SIGNAL_OPTIONS_UPDATED
 )
 from .coordinator import EasyplusCoordinator
+from .xml_import import XmlImportError, apply_xml_config
+from .services import async_setup_services, async_unload_services
+from .startup import StartupScheduler
 
-PLATFORMS: list[Platform] = [Platform.SWITCH, Platform.LIGHT, Platform.COVER]
+PLATFORMS: list[Platform] = [
+    Platform.SWITCH, Platform.LIGHT, Platform.COVER,
+    Platform.BINARY_SENSOR, Platform.EVENT, Platform.SENSOR
+]
+INPUT_PLATFORMS = [Platform.BINARY_SENSOR, Platform.EVENT]
 
 _LOGGER = logging.getLogger(__name__)
 
-# Regex om "rommel" namen te herkennen uit de XML
-JUNK_NAME_PATTERN = re.compile(r"^(Re \+\d+|relay \d+|Ch \d+|In \d+|\d+)$", re.IGNORECASE)
+# Domein-brede scheduler die de opstart van meerdere controllers spreidt
+DATA_STARTUP_SCHEDULER = f"{DOMAIN}_startup_scheduler"
+
+# Opties die de platforms live kunnen toepassen (geen reload, sessie blijft open)
+HOT_APPLY_OPTIONS = {CONF_COVERS}
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Easyplus Apex from a config entry."""
     
     # 1. Verwerk XML (indien aanwezig)
+    # De flows verwerken de XML al vooraf; dit vangt alleen oudere entries op.
+    # We passen de opties hier in-place toe, vóór de update listener bestaat,
+    # zodat dit geen extra reload veroorzaakt.
     if CONF_XML_CONTENT in entry.options:
         _LOGGER.info("Processing imported XML configuration with Smart Filtering...")
-        await parse_and_apply_xml(hass, entry)
+        try:
+            new_options = apply_xml_config(entry.options, entry.options[CONF_XML_CONTENT])
+        except XmlImportError as err:
+            _LOGGER.error(err)
+        else:
+            hass.config_entries.async_update_entry(entry, options=new_options)
+
+    # 2. Verbinden (en synchroniseren) binnen een opstartplaats
+    coordinator = EasyplusCoordinator(hass, entry)
+    scheduler: StartupScheduler = hass.data.setdefault(DATA_STARTUP_SCHEDULER, StartupScheduler())
+    priority = entry.options.get(CONF_STARTUP_PRIORITY, DEFAULT_STARTUP_PRIORITY)
+
+    requested = time.monotonic()
+    async with scheduler.slot(priority):
+        waited = time.monotonic() - requested
+        await _async_start_controller(hass, entry, coordinator)
+
+    ready = time.monotonic() - requested
+    coordinator.startup_timing = {
+        "priority": priority,
+        "slot_wait": round(waited, 3),
+        "time_to_ready": round(ready, 3),
+    }
+    _LOGGER.info(
+        "Easyplus Apex %s ready in %.2fs (waited %.2fs for a startup slot)",
+        entry.title, ready, waited
+    )
+    return True
 
-    # 2. Verbinden
+
+async def _async_start_controller(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: EasyplusCoordinator
+) -> None:
+    """Handshake, platforms en initiële sync; de scheduler houdt dit beperkt tot enkele tegelijk."""
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
 
-    coordinator = EasyplusCoordinator(hass, entry)
-
     if not await coordinator.connect():
         raise ConfigEntryNotReady(f"Failed connection to {host}:{port}")
 
+    await coordinator.async_load_learning()
+    await coordinator.async_load_statistics()
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    async_setup_services(hass)
 
     # 3. Listeners & Background tasks
     entry.async_on_unload(entry.add_update_listener(async_update_options))
 
-    entry.async_create_background_task(
-        hass,
-        coordinator._receive_loop(),
-        name=f"Easyplus Apex Receive Loop - {entry.entry_id}"
-    )
+    coordinator.start_background_tasks()
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Alleen platforms met inhoud; de rest laden we pas bij de eerste discovery
+    await async_ensure_platforms(hass, entry, _configured_platforms(entry.options))
+    if not entry.options.get(CONF_STRICT_MODE, False):
+        _listen_for_lazy_platforms(hass, entry, coordinator)
 
     # 4. INITIAL STATE FETCH
     if entry.options.get(CONF_STRICT_MODE, False):
         _LOGGER.debug("Strict Mode active: Fetching initial states...")
         await asyncio.sleep(1)
         await coordinator.fetch_initial_states()
+        await coordinator.async_wait_initial_sync()
+    elif entry.options.get(CONF_INSTANT_DISCOVERY, DEFAULT_INSTANT_DISCOVERY):
+        # De dump maakt alle uitgangen in één keer aan (platforms laden lazy)
+        _LOGGER.info("Auto-Discovery Mode: Discovering all outputs from a GetData snapshot.")
+        await coordinator.fetch_initial_states()
+        await coordinator.async_wait_initial_sync()
     else:
         _LOGGER.info("Auto-Discovery Mode: Waiting for user activity (Discovery by Use).")
 
-    return True
+    # Platforms die de dump lazy liet laden: klaar vóór de entry als geladen geldt
+    while coordinator.platform_loads:
+        await asyncio.wait(list(coordinator.platform_loads))
+
+
+def _configured_platforms(options) -> list[Platform]:
+    """Platforms die volgens de opties (XML / rolluiken) entiteiten hebben."""
+    platforms = []
+    if options.get(CONF_COVERS):
+        platforms.append(Platform.COVER)
+    if options.get(CONF_OUTPUT_STATISTICS, False):
+        platforms.append(Platform.SENSOR)
+    if options.get(CONF_STRICT_MODE, False):
+        if options.get(CONF_XML_SWITCHES):
+            platforms.append(Platform.SWITCH)
+        if options.get(CONF_XML_DIMMERS):
+            platforms.append(Platform.LIGHT)
+        if options.get(CONF_XML_INPUTS):
+            platforms.extend(INPUT_PLATFORMS)
+    return platforms
+
+
+async def async_ensure_platforms(
+    hass: HomeAssistant, entry: ConfigEntry, platforms: list[Platform]
+) -> None:
+    """Forward platforms die nog niet geladen zijn (elk platform maar één keer)."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    missing = [p for p in platforms if p not in coordinator.loaded_platforms]
+    if not missing:
+        return
+    # Eerst markeren: discovery kan tijdens het laden opnieuw triggeren
+    coordinator.loaded_platforms.update(missing)
+    await hass.config_entries.async_forward_entry_setups(entry, missing)
+
+
+@callback
+def _listen_for_lazy_platforms(hass: HomeAssistant, entry: ConfigEntry, coordinator) -> None:
+    """Discovery mode: laad een platform zodra er een entiteit van dat type opduikt."""
+    def _lazy(platforms: list[Platform]):
+        @callback
+        def _on_discovery(address: int) -> None:
+            if all(p in coordinator.loaded_platforms for p in platforms):
+                return
+            task = hass.async_create_task(async_ensure_platforms(hass, entry, platforms))
+            coordinator.platform_loads.add(task)
+            task.add_done_callback(coordinator.platform_loads.discard)
+        return _on_discovery
+
+    coordinator.listen_for_new_relays(_lazy([Platform.SWITCH]))
+    coordinator.listen_for_new_dimmers(_lazy([Platform.LIGHT]))
+    coordinator.listen_for_new_inputs(_lazy(INPUT_PLATFORMS))
 
-async def parse_and_apply_xml(hass: HomeAssistant, entry: ConfigEntry):
-    """Parse de XML, filter rommel, en scheid Switches van Dimmers (zonder dubbels)."""
-    xml_content = entry.options[CONF_XML_CONTENT]
-    new_options = dict(entry.options)
-    
-    naming_map = {}
-    covers = []
-    
-    # AANGEPAST: Gebruik 'set' in plaats van 'list' om dubbele adressen te voorkomen
-    valid_switches = set()
-    valid_dimmers = set()
-    
-    try:
-        root = ET.fromstring(xml_content)
-        
-        for item in root.iter():
-            if item.tag not in ['digout', 'dim']:
-                continue
-
-            try:
-                address = int(item.get('adr'))
-                raw_name = item.get('name', "")
-                name = raw_name.strip()
-                item_type = item.get('type') # light, dimmer, shutter
-                tag = item.tag # 'dim' of 'digout'
-
-                if not name: continue
-
-                # FILTER: Is het rommel?
-                is_junk = JUNK_NAME_PATTERN.match(name)
-                
-                # Uitzondering: Rolluiken mogen rommel-namen hebben
-                if is_junk and item_type != 'shutter':
-                    continue
-
-                naming_map[str(address)] = name
-
-                if item_type == 'shutter':
-                    # Rolluiken checken we handmatig op dubbels in de lijst
-                    # (Sets werken niet direct met dicts, dus eenvoudige check)
-                    existing_ids = [c[CONF_ADDR_DIR] for c in covers]
-                    if address not in existing_ids:
-                        covers.append({
-                            CONF_COVER_NAME: name,
-                            CONF_ADDR_DIR: address,
-                            CONF_ADDR_POWER: address + 1,
-                            CONF_TRAVEL_TIME: 25.0,
-                            "origin": "xml"
-                        })
-                elif tag == 'dim':
-                    valid_dimmers.add(address) # .add() voor sets
-                elif tag == 'digout':
-                    valid_switches.add(address) # .add() voor sets
-                        
-            except (ValueError, TypeError):
-                continue
-
-        new_options[CONF_NAMING_MAP] = naming_map
-        new_options[CONF_COVERS] = covers
-        # AANGEPAST: Converteer sets terug naar lijsten voor opslag in JSON
-        new_options[CONF_XML_SWITCHES] = list(valid_switches)
-        new_options[CONF_XML_DIMMERS] = list(valid_dimmers)
-        new_options[CONF_STRICT_MODE] = True
-        new_options.pop(CONF_XML_CONTENT)
-
-        hass.config_entries.async_update_entry(entry, options=new_options)
-        _LOGGER.info(f"XML Import: {len(valid_switches)} switches, {len(valid_dimmers)} dimmers, {len(covers)} covers.")
-
-    except ET.ParseError as err:
-        _LOGGER.error(f"Could not parse XML: {err}")
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     coordinator = hass.data[DOMAIN].get(entry.entry_id)
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    platforms = list(coordinator.loaded_platforms) if coordinator else PLATFORMS
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
     if unload_ok and coordinator:
         await coordinator.stop()
-        await asyncio.sleep(1.0)
         hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            async_unload_services(hass)
     return unload_ok
 
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is not None:
+        old_options = coordinator.applied_options
+        new_options = dict(entry.options)
+        changed = {
+            key for key in old_options.keys() | new_options.keys()
+            if old_options.get(key) != new_options.get(key)
+        }
+        if changed <= HOT_APPLY_OPTIONS:
+            _LOGGER.debug("Hot-applying option changes: %s", changed)
+            coordinator.applied_options = new_options
+            # Eerste rolluik: het cover platform leest de nieuwe opties bij het laden
+            await async_ensure_platforms(hass, entry, _configured_platforms(new_options))
+            async_dispatcher_send(
+                hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), old_options, new_options
+            )
+            return
+
     await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,76 @@
+"""Platform for Easyplus Apex binary_sensor integration (fysieke ingangen)."""
+import logging
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import (
+    DOMAIN,
+    CONF_NAMING_MAP,
+    CONF_STRICT_MODE,
+    CONF_XML_INPUTS
+)
+from .coordinator import EasyplusCoordinator
+from .entity import ConnectionAvailability, EntityBatcher
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up input binary sensors using the filtered XML list."""
+    coordinator: EasyplusCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    naming_map = entry.options.get(CONF_NAMING_MAP, {})
+    strict_mode = entry.options.get(CONF_STRICT_MODE, False)
+    xml_inputs = entry.options.get(CONF_XML_INPUTS, [])
+    batcher = EntityBatcher(hass, async_add_entities)
+
+    @callback
+    def async_add_input(address: int):
+        # STRICT MODE LOGICA
+        if strict_mode and address not in xml_inputs:
+            return
+
+        name = naming_map.get(f"in_{address}") or f"Apex Input {address}"
+        batcher.add(EasyplusInputSensor(coordinator, entry, address, name))
+
+    if strict_mode and xml_inputs:
+        for address in xml_inputs:
+            async_add_input(address)
+    else:
+        # Fallback Auto-Discovery
+        coordinator.listen_for_new_inputs(async_add_input)
+        for address in coordinator.known_inputs:
+            async_add_input(address)
+
+
+class EasyplusInputSensor(ConnectionAvailability, BinarySensorEntity):
+    """Representation of an Easyplus Apex physical input."""
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, config_entry, address, name):
+        self.coordinator = coordinator
+        self._address = address
+        self._attr_name = name
+        self._attr_unique_id = f"{config_entry.entry_id}_input_{address}"
+        self._attr_device_info = coordinator.device_info
+
+    @property
+    def is_on(self) -> bool | None:
+        return self.coordinator.get_input_state(self._address)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.add_listener(f"input_{self._address}", self._handle_coordinator_update)
+        )
@@ -0,0 +1,91 @@
+"""Opname en replay van de ruwe Easyplus protocolstroom.
+
+Bestandsformaat: een magic header gevolgd door records van de vorm
+<delta_us:uint32><richting:uint8><lengte:uint32><payload>, waarbij delta_us
+de monotone tijd sinds het vorige record is. Afspelen gebeurt via de
+replay_capture service, in een losse coordinator.
+"""
+import asyncio
+import struct
+import time
+from collections.abc import Callable, Iterator
+
+CAPTURE_MAGIC = b"EPXC\x01"
+CAPTURE_SUFFIX = ".epcap"
+
+DIR_IN = 0
+DIR_OUT = 1
+
+# Bovengrens zodat een vergeten capture het geheugen niet volloopt
+MAX_CAPTURE_BYTES = 16 * 1024 * 1024
+
+_RECORD = struct.Struct("<IBI")
+_MAX_DELTA_US = 0xFFFFFFFF
+
+
+class ProtocolCapture:
+    """Verzamelt ruwe in- en uitgaande bytes met monotone tijdstempels."""
+
+    def __init__(self, max_bytes: int = MAX_CAPTURE_BYTES) -> None:
+        self._buffer = bytearray(CAPTURE_MAGIC)
+        self._last = time.monotonic()
+        self._max_bytes = max_bytes
+        self.records = 0
+        self.truncated = False
+
+    def record(self, direction: int, data: bytes) -> None:
+        if len(self._buffer) + _RECORD.size + len(data) > self._max_bytes:
+            self.truncated = True
+            return
+        now = time.monotonic()
+        delta = min(int((now - self._last) * 1_000_000), _MAX_DELTA_US)
+        self._last = now
+        self._buffer += _RECORD.pack(delta, direction, len(data))
+        self._buffer += data
+        self.records += 1
+
+    def getvalue(self) -> bytes:
+        return bytes(self._buffer)
+
+
+def iter_capture(data: bytes) -> Iterator[tuple[float, int, bytes]]:
+    """Geef (delta in seconden, richting, payload) per record terug."""
+    if not data.startswith(CAPTURE_MAGIC):
+        raise ValueError("Not an Easyplus capture file")
+    offset = len(CAPTURE_MAGIC)
+    end = len(data)
+    while offset + _RECORD.size <= end:
+        delta, direction, length = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        if offset + length > end:
+            raise ValueError("Truncated capture record")
+        yield delta / 1_000_000, direction, data[offset:offset + length]
+        offset += length
+
+
+async def async_replay(
+    data: bytes,
+    feed: Callable[[bytes], None],
+    realtime: bool = False,
+    include_outbound: bool = False,
+) -> int:
+    """Speel een capture af via `feed`, in echte tijd of op maximale snelheid.
+
+    Uitgaande records worden standaard alleen voor de timing gebruikt.
+    Geeft het aantal afgespeelde records terug.
+    """
+    count = 0
+    pending_delay = 0.0
+    for delta, direction, payload in iter_capture(data):
+        pending_delay += delta
+        if direction != DIR_IN and not include_outbound:
+            continue
+        if realtime and pending_delay > 0:
+            await asyncio.sleep(pending_delay)
+        elif count % 500 == 0:
+            # Geef de event loop af en toe lucht op maximale snelheid
+            await asyncio.sleep(0)
+        pending_delay = 0.0
+        feed(payload)
+        count += 1
+    return count
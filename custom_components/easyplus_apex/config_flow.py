@@ -6,14 +6,26 @@ import voluptuous as vol
 from homeassistant.config_entries import ConfigFlow, ConfigFlowResult, OptionsFlow
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
 
 from .const import (
     DOMAIN, CONF_HOST, CONF_PORT, CONF_PASSWORD,
     CONF_COVERS, CONF_COVER_NAME, CONF_ADDR_DIR, 
     CONF_ADDR_POWER, CONF_TRAVEL_TIME, CONF_INVERT_DIR,
-    CONF_XML_CONTENT
+    CONF_XML_CONTENT, CONF_RECONCILE_INTERVAL, DEFAULT_RECONCILE_INTERVAL,
+    CONF_MAX_UPDATE_RATE, DEFAULT_MAX_UPDATE_RATE,
+    CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC,
+    CONF_SUPPRESS_REDUNDANT, DEFAULT_SUPPRESS_REDUNDANT,
+    CONF_LEARN_COVERS, DEFAULT_LEARN_COVERS,
+    CONF_OUTPUT_STATISTICS, DEFAULT_OUTPUT_STATISTICS,
+    CONF_INSTANT_DISCOVERY, DEFAULT_INSTANT_DISCOVERY,
+    CONF_STARTUP_PRIORITY, DEFAULT_STARTUP_PRIORITY,
+    CONF_COMMAND_JOURNAL, DEFAULT_COMMAND_JOURNAL
 )
 
+from .protocol import AuthRejected, NoReadyPrompt, async_handshake
+from .xml_import import XmlImportError, apply_xml_config
+
 _LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema({
@@ -32,29 +44,14 @@ async def validate_input(host: str, port: int, password: str) -> dict[str, str]:
             asyncio.open_connection(host, port), timeout=10
         )
 
-        ready_received = False
         try:
-            for _ in range(10): 
-                line_bytes = await asyncio.wait_for(reader.readuntil(b'\n'), timeout=2)
-                line = line_bytes.decode('ascii').strip()
-                if line.lstrip().startswith(">Ready"):
-                    ready_received = True
-                    break
-            if not ready_received:
-                raise CannotConnect("Did not receive '>Ready' prompt.")
-        except Exception as e:
+            await async_handshake(reader, writer, password)
+        except NoReadyPrompt as e:
+            raise CannotConnect(str(e))
+        except AuthRejected as e:
+            raise InvalidAuth(str(e))
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
             raise CannotConnect(f"Error reading banner: {e}")
-
-        pass_cmd = f"Pass {password}\n"
-        writer.write(pass_cmd.encode('ascii'))
-        await writer.drain()
-
-        try:
-            await asyncio.wait_for(reader.read(1), timeout=0.5)
-        except asyncio.TimeoutError:
-            pass 
-        except asyncio.IncompleteReadError:
-            raise InvalidAuth("Connection closed after password.")
         
         return {"title": f"Easyplus Apex ({host})"}
 
@@ -123,17 +120,25 @@ class EasyplusApexConfigFlow(ConfigFlow, domain=DOMAIN):
         return self.async_create_entry(title=self.title, data=self.login_data)
 
     async def async_step_upload_xml(self, user_input=None) -> ConfigFlowResult:
+        errors: dict[str, str] = {}
         if user_input is not None:
-            return self.async_create_entry(
-                title=self.title, 
-                data=self.login_data,
-                options={CONF_XML_CONTENT: user_input[CONF_XML_CONTENT]}
-            )
+            # XML hier al verwerken: de entry start meteen met de juiste opties
+            try:
+                options = apply_xml_config({}, user_input[CONF_XML_CONTENT])
+            except XmlImportError:
+                errors["base"] = "invalid_xml"
+            else:
+                return self.async_create_entry(
+                    title=self.title, 
+                    data=self.login_data,
+                    options=options
+                )
 
         return self.async_show_form(
             step_id="upload_xml",
             data_schema=vol.Schema({vol.Required(CONF_XML_CONTENT): str}),
-            description_placeholders={"info": "Open config.xml, kopieer alles en plak hier."}
+            description_placeholders={"info": "Open config.xml, kopieer alles en plak hier."},
+            errors=errors
         )
 
 class EasyplusOptionsFlowHandler(OptionsFlow):
@@ -145,14 +150,20 @@ class EasyplusOptionsFlowHandler(OptionsFlow):
         self.covers = list(self.entry.options.get(CONF_COVERS, []))
         self.detected_ids = []
         self.editing_cover_idx = None # Houdt bij welk rolluik we bewerken
+        self.learned = {} # Suggesties uit passief leren, per key "richting_stroom"
 
     async def async_step_init(self, user_input=None) -> ConfigFlowResult:
         """Start menu."""
         menu = [
             "import_xml_config",
             "detect_cover_start", 
-            "add_cover_manual"
+            "add_cover_manual",
+            "settings"
         ]
+        # Toon geleerde rolluiken alleen als er suggesties zijn
+        self.learned = self._learned_suggestions()
+        if self.learned:
+            menu.append("learned_covers")
         # Toon Edit/Remove alleen als er covers zijn
         if self.covers:
             menu.append("edit_cover_select") # NIEUW
@@ -162,18 +173,73 @@ class EasyplusOptionsFlowHandler(OptionsFlow):
 
     # --- XML IMPORT (Refresh) ---
     async def async_step_import_xml_config(self, user_input=None) -> ConfigFlowResult:
+        errors: dict[str, str] = {}
         if user_input is not None:
-            # Hier gebruiken we de helper om te zorgen dat we niets overschrijven
             # Maar let op: XML import overschrijft sowieso veel, dat is de bedoeling.
-            # De logica in __init__.py handelt de verwerking af.
-            new_opts = dict(self.entry.options)
-            new_opts[CONF_XML_CONTENT] = user_input[CONF_XML_CONTENT]
-            return self.async_create_entry(title="XML Imported", data=new_opts)
+            # We verwerken de XML hier, zodat het opslaan maar één reload kost.
+            try:
+                new_opts = apply_xml_config(self.entry.options, user_input[CONF_XML_CONTENT])
+            except XmlImportError:
+                errors["base"] = "invalid_xml"
+            else:
+                return self.async_create_entry(title="XML Imported", data=new_opts)
 
         return self.async_show_form(
             step_id="import_xml_config",
             data_schema=vol.Schema({vol.Required(CONF_XML_CONTENT): str}),
-            description_placeholders={"info": "Plak nieuwe XML content."}
+            description_placeholders={"info": "Plak nieuwe XML content."},
+            errors=errors
+        )
+
+    # --- RUNTIME INSTELLINGEN ---
+    async def async_step_settings(self, user_input=None) -> ConfigFlowResult:
+        """Algemene instellingen van de verbinding."""
+        if user_input is not None:
+            new_data = dict(self.entry.options)
+            new_data.update(user_input)
+            return self.async_create_entry(title="", data=new_data)
+
+        opts = self.entry.options
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_RECONCILE_INTERVAL,
+                    default=opts.get(CONF_RECONCILE_INTERVAL, DEFAULT_RECONCILE_INTERVAL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                vol.Required(
+                    CONF_MAX_UPDATE_RATE,
+                    default=opts.get(CONF_MAX_UPDATE_RATE, DEFAULT_MAX_UPDATE_RATE)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=50)),
+                vol.Required(
+                    CONF_OPTIMISTIC,
+                    default=opts.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC)
+                ): bool,
+                vol.Required(
+                    CONF_SUPPRESS_REDUNDANT,
+                    default=opts.get(CONF_SUPPRESS_REDUNDANT, DEFAULT_SUPPRESS_REDUNDANT)
+                ): bool,
+                vol.Required(
+                    CONF_LEARN_COVERS,
+                    default=opts.get(CONF_LEARN_COVERS, DEFAULT_LEARN_COVERS)
+                ): bool,
+                vol.Required(
+                    CONF_OUTPUT_STATISTICS,
+                    default=opts.get(CONF_OUTPUT_STATISTICS, DEFAULT_OUTPUT_STATISTICS)
+                ): bool,
+                vol.Required(
+                    CONF_INSTANT_DISCOVERY,
+                    default=opts.get(CONF_INSTANT_DISCOVERY, DEFAULT_INSTANT_DISCOVERY)
+                ): bool,
+                vol.Required(
+                    CONF_STARTUP_PRIORITY,
+                    default=opts.get(CONF_STARTUP_PRIORITY, DEFAULT_STARTUP_PRIORITY)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                vol.Required(
+                    CONF_COMMAND_JOURNAL,
+                    default=opts.get(CONF_COMMAND_JOURNAL, DEFAULT_COMMAND_JOURNAL)
+                ): bool,
+            })
         )
 
     # --- NIEUW: EDIT COVER FLOW ---
@@ -266,6 +332,51 @@ class EasyplusOptionsFlowHandler(OptionsFlow):
     async def async_step_detect_failed(self, user_input=None) -> ConfigFlowResult:
         return await self.async_step_init()
 
+    # --- PASSIEF GELEERD ---
+    def _learned_suggestions(self) -> dict[str, dict]:
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self.entry.entry_id)
+        if coordinator is None or coordinator.learner is None:
+            return {}
+        in_use = set()
+        for cov in self.covers:
+            in_use.add(int(cov[CONF_ADDR_DIR]))
+            in_use.add(int(cov[CONF_ADDR_POWER]))
+        return {
+            f"{item['direction']}_{item['power']}": item
+            for item in coordinator.learner.suggestions(in_use)
+        }
+
+    async def async_step_learned_covers(self, user_input=None) -> ConfigFlowResult:
+        """Voeg rolluiken toe die uit normaal gebruik geleerd zijn."""
+        if user_input is not None:
+            for key in user_input["selected"]:
+                item = self.learned[key]
+                times = [t for t in (item["travel_time_open"], item["travel_time_close"]) if t]
+                self.covers.append({
+                    CONF_COVER_NAME: f"Rolluik {item['direction']}",
+                    CONF_ADDR_DIR: item["direction"],
+                    CONF_ADDR_POWER: item["power"],
+                    CONF_TRAVEL_TIME: float(round(max(times))) if times else 25.0,
+                    CONF_INVERT_DIR: False,
+                    "origin": "learned"
+                })
+            return self._update_entry()
+
+        options = {}
+        for key, item in self.learned.items():
+            label = f"{item['direction']} / {item['power']} ({item['observations']}x"
+            times = [t for t in (item["travel_time_open"], item["travel_time_close"]) if t]
+            if times:
+                label += f", ~{max(times):.0f}s"
+            options[key] = label + ")"
+
+        return self.async_show_form(
+            step_id="learned_covers",
+            data_schema=vol.Schema({
+                vol.Optional("selected", default=[]): cv.multi_select(options),
+            })
+        )
+
     # --- HANDMATIG ---
     async def async_step_add_cover_manual(self, user_input=None) -> ConfigFlowResult:
         if user_input is not None:
@@ -3,6 +3,9 @@ from homeassistant.const import CONF_HOST, CONF_PORT, CONF_PASSWORD
 
 DOMAIN = "easyplus_apex"
 
+# Dispatcher signaal voor opties die zonder reload toegepast worden ({entry_id})
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
+
 # Configuratie sleutels
 CONF_COVERS = "covers"
 CONF_COVER_NAME = "cover_name"
@@ -17,3 +20,24 @@ CONF_NAMING_MAP = "naming_map"        # Opslag: {adres: "Naam"}
 CONF_STRICT_MODE = "strict_mode"      # Als True: negeer alles wat niet in XML staat
 CONF_XML_SWITCHES = "xml_switches" # Lijst van adressen die ECHT switches zijn
 CONF_XML_DIMMERS = "xml_dimmers"   # Lijst van adressen die ECHT dimmers zijn
+CONF_XML_INPUTS = "xml_inputs"     # Lijst van adressen van fysieke ingangen (drukknoppen)
+
+# Runtime instellingen (Opties > Instellingen)
+CONF_RECONCILE_INTERVAL = "reconcile_interval"  # Seconden tussen GetData controles (0 = uit)
+DEFAULT_RECONCILE_INTERVAL = 0
+CONF_MAX_UPDATE_RATE = "max_update_rate"        # Max state writes per seconde per entiteit (0 = onbeperkt)
+DEFAULT_MAX_UPDATE_RATE = 0
+CONF_OPTIMISTIC = "optimistic"                  # Toon de gevraagde state meteen (met rollback)
+DEFAULT_OPTIMISTIC = False
+CONF_SUPPRESS_REDUNDANT = "suppress_redundant"  # Sla commando's over als de uitgang al zo staat
+DEFAULT_SUPPRESS_REDUNDANT = False
+CONF_LEARN_COVERS = "learn_covers"              # Leer rolluik paren/looptijden passief uit gebruik
+DEFAULT_LEARN_COVERS = False
+CONF_OUTPUT_STATISTICS = "output_statistics"    # Aan-tijd en schakelcycli per uitgang als sensoren
+DEFAULT_OUTPUT_STATISTICS = False
+CONF_INSTANT_DISCOVERY = "instant_discovery"    # Auto-discovery: alles uit een GetData dump bij opstart
+DEFAULT_INSTANT_DISCOVERY = False
+CONF_STARTUP_PRIORITY = "startup_priority"      # Volgorde bij gespreide opstart (laag = eerst)
+DEFAULT_STARTUP_PRIORITY = 10
+CONF_COMMAND_JOURNAL = "command_journal"        # Bewaar mislukte commando's en verstuur ze na herverbinden
+DEFAULT_COMMAND_JOURNAL = False
@@ -2,12 +2,86 @@
 
 import asyncio
 import logging
-
-from homeassistant.core import HomeAssistant, callback
-from .const import DOMAIN, CONF_HOST, CONF_PORT, CONF_PASSWORD
+import time
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.storage import Store
+from .const import (
+    DOMAIN, CONF_HOST, CONF_PORT, CONF_PASSWORD,
+    CONF_STRICT_MODE, CONF_INSTANT_DISCOVERY, DEFAULT_INSTANT_DISCOVERY,
+    CONF_RECONCILE_INTERVAL, DEFAULT_RECONCILE_INTERVAL,
+    CONF_MAX_UPDATE_RATE, DEFAULT_MAX_UPDATE_RATE,
+    CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC,
+    CONF_SUPPRESS_REDUNDANT, DEFAULT_SUPPRESS_REDUNDANT,
+    CONF_LEARN_COVERS, DEFAULT_LEARN_COVERS,
+    CONF_OUTPUT_STATISTICS, DEFAULT_OUTPUT_STATISTICS,
+    CONF_COMMAND_JOURNAL, DEFAULT_COMMAND_JOURNAL
+)
+from .capture import DIR_IN, DIR_OUT, ProtocolCapture
+from .flight_recorder import FlightRecorder
+from .framing import READ_CHUNK_SIZE, LineFramer
+from .journal import CommandJournal
+from .learning import ShutterLearner
+from .output_stats import OutputStatistics
+from .protocol import (
+    GET_DATA, DimmerEvent, HandshakeError, InputEvent, RelayEvent,
+    async_handshake, decode_frame, encode_set_dimmer, encode_set_relay
+)
+from .throttle import Throttle
+from .state_store import OutputStateStore, STORE_CHANGED, STORE_NEW, STORE_UNCHANGED
+from .profiler import (
+    LatencyProfiler, STAGE_READ, STAGE_PARSE, STAGE_UPDATE,
+    STAGE_NOTIFY, STAGE_ENTITY_WRITE
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Achtergrond reconciliatie
+RECONCILE_MIN_INTERVAL = 60     # Nooit vaker dan dit (seconden)
+RECONCILE_WINDOW = 5.0          # Maximale wachttijd op de dump na GetData
+RECONCILE_COMMAND_QUIET = 5.0   # Pauzeer zolang er recent commando's verstuurd zijn
+
+# Optimistische modus: zo lang wachten we op de echo van de controller
+OPTIMISTIC_TIMEOUT = 5.0
+
+# Een verstuurd commando geldt als "onderweg" tot de echo of deze timeout
+IN_FLIGHT_TIMEOUT = 5.0
+
+# Command latency: write van Setrelay (stroomrelais rolluik) -> DigitalOut echo (voortschrijdend gemiddelde)
+LATENCY_ALPHA = 0.2
+LATENCY_SAMPLE_MAX = 2.0        # Langere "echo's" zijn geen antwoord op ons commando
+LATENCY_MAX_PENDING = 1024
+
+# Passief leren van rolluiken: opslaan hooguit eens per zoveel seconden
+LEARNING_STORAGE_VERSION = 1
+LEARNING_SAVE_DELAY = 300
+
+# Gebruiksstatistieken per uitgang
+STATISTICS_STORAGE_VERSION = 1
+STATISTICS_SAVE_DELAY = 300
+STATISTICS_SAVE_INTERVAL = 900  # Zolang een uitgang aan staat (geen overgangen)
+
+# Benoemde snapshots van alle uitgangen (scene services)
+SNAPSHOT_STORAGE_VERSION = 1
+
+# Herverbinden na een onderbreking (exponentiële backoff)
+RECONNECT_MIN_DELAY = 5
+RECONNECT_MAX_DELAY = 60
+
+# Beschikbaarheid: zoveel state writes per loop-iteratie bij een verbindingswissel
+AVAILABILITY_BATCH_SIZE = 100
+
+# Initiële synchronisatie: de dump is binnen als er zo lang niets meer ontvangen is
+SYNC_QUIET_TIME = 0.5
+SYNC_TIMEOUT = 10.0
+
+# Afsluiten: harde bovengrenzen zodat een unload nooit lang blokkeert
+SHUTDOWN_FLUSH_TIMEOUT = 0.5    # Wachten op commando's die al in de wachtrij staan
+SHUTDOWN_CLOSE_TIMEOUT = 0.5    # Wachten tot de socket gesloten is
+SHUTDOWN_TASK_TIMEOUT = 0.5     # Wachten tot geannuleerde taken gestopt zijn
+
 class EasyplusCoordinator:
     """Beheert de verbinding en data-uitwisseling."""
 
@@ -19,29 +93,125 @@ class EasyplusCoordinator:
         self._port = entry.data[CONF_PORT]
         self._password = entry.data[CONF_PASSWORD]
 
+        # Eén gedeeld device voor alle entiteiten van deze controller
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="Apex Systems International",
+        )
+
+        # Opties waarmee de platforms nu draaien (voor live toepassen van wijzigingen)
+        self.applied_options: dict = dict(entry.options)
+        self.loaded_platforms: set = set()
+        self.platform_loads: set[asyncio.Task] = set()  # Lopende lazy forwards
+
         self._reader: asyncio.StreamReader | None = None
         self._writer: asyncio.StreamWriter | None = None
         self._is_connected = False
         self._connect_lock = asyncio.Lock()
         self._shutdown_requested = False
         self._send_lock = asyncio.Lock()
+        self._flush_on_shutdown = True
+        self._tasks: list[asyncio.Task] = []
+        self._framer = LineFramer()
+        self._last_receive_time = 0.0
+        self.frame_errors = 0
 
-        # State
-        self._relay_states: dict[int, bool] = {}
-        self._dimmer_states: dict[int, int] = {}
-        
-        # Discovery Sets
-        self.known_relays: set[int] = set()
-        self.known_dimmers: set[int] = set()
+        # Opstart: wachttijd op een plaats en tijd tot ready (zie startup.py)
+        self.startup_timing: dict | None = None
+
+        # State (compacte opslag per adres; dient ook als discovery set)
+        self._relay_states = OutputStateStore()
+        self._dimmer_states = OutputStateStore()
+        self._input_states = OutputStateStore()
 
         # Listeners
         self._listeners: dict[str, list] = {}
+        rate = float(entry.options.get(CONF_MAX_UPDATE_RATE, DEFAULT_MAX_UPDATE_RATE))
+        self._throttle_interval = 1.0 / rate if rate > 0 else 0.0
         self._new_relay_callbacks = []
         self._new_dimmer_callbacks = []
+        self._new_input_callbacks = []
         
+        # Entiteiten die hun beschikbaarheid uit de verbinding afleiden
+        self._availability_listeners: set = set()
+        self._availability_dirty = False
+        self._availability_task: asyncio.Task | None = None
+
         # Tijdelijke listeners voor de "Discovery by Use" wizard
         self._activity_callbacks = []
 
+        # Laatste regels en verbindingsgebeurtenissen (altijd aan, voor diagnostics)
+        self.flight_recorder = FlightRecorder()
+
+        # Ruwe protocol opname (alleen actief via de start_capture service)
+        self._capture: ProtocolCapture | None = None
+
+        # Reconciliatie (periodieke GetData om gemiste events te herstellen)
+        self._reconcile_interval = int(
+            entry.options.get(CONF_RECONCILE_INTERVAL, DEFAULT_RECONCILE_INTERVAL)
+        )
+        self._reconcile_seen: set[str] | None = None
+        # Discovery by Use vraagt bewust geen GetData: een dump zou alle uitgangen aanmaken
+        self.full_dumps = bool(
+            entry.options.get(CONF_STRICT_MODE, False)
+            or entry.options.get(CONF_INSTANT_DISCOVERY, DEFAULT_INSTANT_DISCOVERY)
+        )
+        self._last_command_time = 0.0
+        self.reconcile_runs = 0
+        self.drift_count = 0
+
+        # Optimistische modus: verwachte echo per listener key
+        self.optimistic = bool(entry.options.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC))
+        self._pending: dict[str, tuple[int, int | None, asyncio.TimerHandle]] = {}
+        self.rollback_count = 0
+
+        # Onderdrukken van overbodige commando's (doel == bevestigde state)
+        self._suppress_redundant = bool(
+            entry.options.get(CONF_SUPPRESS_REDUNDANT, DEFAULT_SUPPRESS_REDUNDANT)
+        )
+        self._in_flight: dict[str, float] = {}
+        self.suppressed_commands = 0
+
+        # Gemeten round-trip van de stroomrelais van rolluiken (voor rolluik compensatie)
+        self._echo_wait: dict[str, float] = {}
+        self.command_latency = 0.0
+        self.latency_samples = 0
+
+        # Journal van niet-verstuurde commando's (opt-in), afgespeeld na herverbinden
+        self.journal: CommandJournal | None = None
+        if entry.options.get(CONF_COMMAND_JOURNAL, DEFAULT_COMMAND_JOURNAL):
+            self.journal = CommandJournal()
+
+        # Passief leren van rolluik paren en looptijden
+        self.learner: ShutterLearner | None = None
+        self._learning_store: Store | None = None
+        if entry.options.get(CONF_LEARN_COVERS, DEFAULT_LEARN_COVERS):
+            self._learning_store = Store(
+                hass, LEARNING_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.learning"
+            )
+        self._learning_dirty = False
+
+        # Aan-tijd / schakelcycli per uitgang (opt-in, voor de sensoren)
+        self.output_stats: OutputStatistics | None = None
+        self._stats_store: Store | None = None
+        if entry.options.get(CONF_OUTPUT_STATISTICS, DEFAULT_OUTPUT_STATISTICS):
+            self._stats_store = Store(
+                hass, STATISTICS_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.statistics"
+            )
+        self._stats_dirty = False
+
+        # Snapshots van relais/dimmers; persistente snapshots pas laden bij eerste gebruik
+        self._snapshots: dict[str, tuple[tuple[bytes, bytes], tuple[bytes, bytes]]] | None = None
+        self._persistent_snapshots: set[str] = set()
+        self._snapshot_store = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshots"
+        )
+
+        # Latency profiler (alleen actief via de start_profiling service)
+        self._profiler: LatencyProfiler | None = None
+        self.last_profile_summary: dict | None = None
+
     # --- "Discovery by Use" Logica ---
     async def detect_activity(self, duration: int = 10) -> set[int]:
         """Luister gedurende x seconden naar actieve relais."""
@@ -67,77 +237,252 @@ class EasyplusCoordinator:
         return active_relays
     # ---------------------------------
 
+    @property
+    def is_connected(self) -> bool:
+        return self._is_connected
+
+    # Discovery Sets (bekende adressen in de state store)
+    @property
+    def known_relays(self) -> OutputStateStore:
+        return self._relay_states
+
+    @property
+    def known_dimmers(self) -> OutputStateStore:
+        return self._dimmer_states
+
+    @property
+    def known_inputs(self) -> OutputStateStore:
+        return self._input_states
+
     def listen_for_new_relays(self, callback_func):
         self._new_relay_callbacks.append(callback_func)
 
     def listen_for_new_dimmers(self, callback_func):
         self._new_dimmer_callbacks.append(callback_func)
 
+    def listen_for_new_inputs(self, callback_func):
+        self._new_input_callbacks.append(callback_func)
+
+    # --- Beschikbaarheid ---
+    def add_availability_listener(self, callback_func):
+        """Wordt (gebundeld) aangeroepen na elke wissel van de verbindingsstatus."""
+        self._availability_listeners.add(callback_func)
+        return lambda: self._availability_listeners.discard(callback_func)
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected == self._is_connected:
+            return
+        self._is_connected = connected
+        if self._shutdown_requested or not self._availability_listeners:
+            return
+        self._availability_dirty = True
+        if self._availability_task is None:
+            self._availability_task = self.hass.async_create_task(
+                self._async_availability_pass()
+            )
+
+    async def _async_availability_pass(self) -> None:
+        """Eén write-ronde over alle entiteiten, in porties zodat de loop vrij blijft.
+
+        Wisselt de verbinding opnieuw tijdens de ronde, dan volgt nog één ronde.
+        """
+        try:
+            while self._availability_dirty and not self._shutdown_requested:
+                self._availability_dirty = False
+                for idx, cb in enumerate(list(self._availability_listeners)):
+                    if idx and idx % AVAILABILITY_BATCH_SIZE == 0:
+                        await asyncio.sleep(0)
+                    # Intussen verwijderde entiteiten overslaan
+                    if cb in self._availability_listeners: cb()
+        finally:
+            self._availability_task = None
+
+    def start_background_tasks(self) -> None:
+        """Start de verbindingslus (en optionele reconciliatie) als entry taken."""
+        self._tasks.append(self._entry.async_create_background_task(
+            self.hass,
+            self._connection_loop(),
+            name=f"Easyplus Apex Receive Loop - {self._entry.entry_id}"
+        ))
+        if self._stats_store is not None:
+            self._tasks.append(self._entry.async_create_background_task(
+                self.hass,
+                self.statistics_loop(),
+                name=f"Easyplus Apex Statistics Loop - {self._entry.entry_id}"
+            ))
+            # HA ontlaadt entries niet bij een herstart: de lopende aan-tijd dan hier opslaan
+            self._entry.async_on_unload(self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_save_statistics_on_stop
+            ))
+        if self.reconcile_enabled:
+            self._tasks.append(self._entry.async_create_background_task(
+                self.hass,
+                self.reconcile_loop(),
+                name=f"Easyplus Apex Reconcile Loop - {self._entry.entry_id}"
+            ))
+
     async def connect(self) -> bool:
         async with self._connect_lock:
             if self._is_connected: return True
             if self._shutdown_requested: return False
+            self.flight_recorder.record_event(f"Connecting to {self._host}:{self._port}")
             try:
                 self._reader, self._writer = await asyncio.wait_for(
                     asyncio.open_connection(self._host, self._port), timeout=10
                 )
                 if await self._authenticate():
-                    self._is_connected = True
+                    self._set_connected(True)
+                    self.flight_recorder.record_event("Connected and authenticated")
                     return True
                 else:
                     await self.disconnect()
                     return False
-            except Exception:
+            except Exception as err:
+                self.flight_recorder.record_event(f"Connect failed: {err!r}")
                 await self.disconnect()
                 return False
 
     async def _authenticate(self) -> bool:
         try:
-            ready = False
-            for _ in range(10):
-                line = await asyncio.wait_for(self._reader.readuntil(b'\n'), timeout=2)
-                if b">Ready" in line:
-                    ready = True
-                    break
-            if not ready: return False
-            self._writer.write(f"Pass {self._password}\n".encode('ascii'))
-            await self._writer.drain()
-            await asyncio.sleep(0.5)
-            return not self._reader.at_eof()
-        except Exception: return False
+            await async_handshake(self._reader, self._writer, self._password)
+            return True
+        except HandshakeError as err:
+            _LOGGER.warning("Handshake with %s:%s failed: %s", self._host, self._port, err)
+            self.flight_recorder.record_event(f"Handshake failed: {err}")
+            return False
+        except Exception as err:
+            self.flight_recorder.record_event(f"Handshake failed: {err!r}")
+            return False
+
+    async def _connection_loop(self) -> None:
+        """Ontvang zolang de verbinding staat; herverbind met backoff na een onderbreking."""
+        delay = RECONNECT_MIN_DELAY
+        while not self._shutdown_requested:
+            if self._is_connected:
+                await self._receive_loop()
+                delay = RECONNECT_MIN_DELAY
+                if self._shutdown_requested: break
+                await self.disconnect()
+            await asyncio.sleep(delay)
+            if await self.connect():
+                _LOGGER.info("Reconnected to %s:%s", self._host, self._port)
+                # Verse framer en (waar toegestaan) volledige dump: events tijdens de onderbreking zijn gemist
+                self._framer = LineFramer()
+                await self._async_replay_journal()
+                if self.full_dumps: await self.fetch_initial_states()
+            else:
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
 
     async def _receive_loop(self) -> None:
+        # Grote chunks lezen en zelf framen: een GetData dump kost zo maar een
+        # paar wake-ups, en één te lange regel kan de loop niet meer stoppen.
         try:
             while self._is_connected:
-                data = await self._reader.readuntil(b'\n')
-                line = data.decode('ascii', errors='ignore').strip()
-                if line: self._parse_line(line)
-        except Exception: pass
+                profiler = self._profiler
+                if profiler is not None:
+                    profiler.start_line()
+                data = await self._reader.read(READ_CHUNK_SIZE)
+                if not data:
+                    break
+                self._last_receive_time = time.monotonic()
+                if self._capture is not None:
+                    self._capture.record(DIR_IN, data)
+                frames = self._framer.feed(data)
+                self.flight_recorder.record_inbound(frames)
+                if profiler is not None and profiler.active:
+                    profiler.lap(STAGE_READ)
+                    self._process_frames_profiled(profiler, frames)
+                else:
+                    self._process_frames(frames)
+        except Exception as err:
+            self.flight_recorder.record_event(f"Receive loop failed: {err!r}")
+            if not self._shutdown_requested:
+                _LOGGER.warning("Receive loop for %s:%s failed: %s", self._host, self._port, err)
         finally:
-            self._is_connected = False
-
-    def _parse_line(self, line: str) -> None:
-        if not line.startswith(">"): return
+            if self._is_connected and not self._shutdown_requested:
+                self.flight_recorder.record_event("Connection closed by controller")
+                _LOGGER.warning("Connection to %s:%s closed by controller", self._host, self._port)
+            self._set_connected(False)
+
+    def _process_frames(self, frames: list[bytes]) -> None:
+        """Verwerk een batch complete regels (ook gebruikt bij replay)."""
+        for frame in frames:
+            self._process_frame(frame)
+
+    def _process_frames_profiled(self, profiler: LatencyProfiler, frames: list[bytes]) -> None:
+        for idx, frame in enumerate(frames):
+            if idx: profiler.resume()
+            self._process_frame(frame)
+            # Regel zonder notify: sluit de lopende stage af
+            if profiler.active:
+                profiler.lap(STAGE_UPDATE if profiler.last_stage == STAGE_PARSE else STAGE_PARSE)
+            profiler.end_line()
+
+    def _process_frame(self, frame: bytes) -> None:
+        # Eén foute regel (of listener) mag de sessie en de rest van de chunk niet kosten
         try:
-            parts = line[1:].split(' ', 1)
-            cmd = parts[0]
-            params = parts[1] if len(parts) > 1 else ""
-            if cmd == "DigitalOut":
-                p = params.split(',')
-                if len(p) == 2: self._update_relay_state(int(p[0]), p[1] == "ON")
-            elif cmd == "AnalogOut":
-                p = params.split(',')
-                if len(p) == 2: self._update_dimmer_state(int(p[0]), int(p[1]))
-        except Exception: pass
+            event = decode_frame(frame)
+            if event is not None: self._handle_event(event)
+        except Exception as err:
+            self.frame_errors += 1
+            self.flight_recorder.record_event(f"Frame {frame[:64]!r} failed: {err!r}")
+            _LOGGER.debug("Error processing frame %r from %s: %s", frame, self._host, err, exc_info=True)
+
+    def _handle_event(self, event) -> None:
+        event_type = type(event)
+        if event_type is RelayEvent:
+            self._update_relay_state(event.address, event.state)
+        elif event_type is DimmerEvent:
+            self._update_dimmer_state(event.address, event.value)
+        elif event_type is InputEvent:
+            self._update_input_state(event.address, event.state)
+
+    @property
+    def discarded_frames(self) -> int:
+        return self._framer.discarded
+
+    # --- Protocol Capture ---
+    def start_capture(self) -> None:
+        _LOGGER.info("Starting protocol capture for %s:%s", self._host, self._port)
+        self._capture = ProtocolCapture()
+
+    def stop_capture(self) -> ProtocolCapture | None:
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            _LOGGER.info(
+                "Protocol capture stopped: %d records%s",
+                capture.records, " (truncated)" if capture.truncated else ""
+            )
+        return capture
+
+    # --- Latency Profiling ---
+    def start_profiling(self, sample_every: int) -> None:
+        _LOGGER.info("Starting latency profiling (1 in %d reads)", sample_every)
+        self._profiler = LatencyProfiler(sample_every)
+
+    def stop_profiling(self) -> dict | None:
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return None
+        self.last_profile_summary = profiler.summary()
+        _LOGGER.info(
+            "Latency profile for %s:%s over %d sampled lines: %s",
+            self._host, self._port, profiler.lines, self.last_profile_summary
+        )
+        return self.last_profile_summary
+
+    def _profile_lap(self, stage: str) -> None:
+        profiler = self._profiler
+        if profiler is not None and profiler.active:
+            profiler.lap(stage)
 
     def _update_relay_state(self, address: int, state: bool):
+        self._profile_lap(STAGE_PARSE)
         # 1. Update de status
-        changed = self._relay_states.get(address) != state
-        self._relay_states[address] = state
+        result = self._relay_states.set(address, 1 if state else 0)
 
         # 2. Trigger Discovery (Auto-create entities)
-        if address not in self.known_relays:
-            self.known_relays.add(address)
+        if result == STORE_NEW:
             for cb in self._new_relay_callbacks: cb(address)
 
         # 3. Trigger Activity Listeners (Voor de Wizard!)
@@ -145,57 +490,492 @@ class EasyplusCoordinator:
         for cb in self._activity_callbacks:
             cb(address)
 
-        # 4. Update HA Entities
-        if changed:
+        # 4. Passief leren (alleen echte overgangen, niet de eerste state uit een dump)
+        if self.learner is not None and result == STORE_CHANGED:
+            if self.learner.observe(address, state, time.monotonic()):
+                self._schedule_learning_save()
+        if self.output_stats is not None and result != STORE_UNCHANGED:
+            if self.output_stats.observe(f"relay_{address}", 1.0 if state else 0.0, time.monotonic()):
+                self._schedule_stats_save()
+
+        # 5. Bevestig een optimistische verwachting / commando onderweg
+        if self._echo_wait:
+            self._record_echo(f"relay_{address}")
+        if self._pending:
+            self._confirm_pending(f"relay_{address}", 1 if state else 0)
+        if self._in_flight:
+            self._in_flight.pop(f"relay_{address}", None)
+
+        # 6. Update HA Entities
+        if self._reconcile_seen is not None:
+            self._check_drift(f"relay_{address}", result)
+        if result != STORE_UNCHANGED:
             self._notify_listeners(f"relay_{address}")
 
     def _update_dimmer_state(self, address: int, value: int):
-        if address not in self.known_dimmers:
-            self.known_dimmers.add(address)
-            for cb in self._new_dimmer_callbacks: cb(address)
-        
+        self._profile_lap(STAGE_PARSE)
         value = max(0, min(255, value))
-        if self._dimmer_states.get(address) != value:
-            self._dimmer_states[address] = value
+        result = self._dimmer_states.set(address, value)
+        if result == STORE_NEW:
+            for cb in self._new_dimmer_callbacks: cb(address)
+        if self.output_stats is not None and result != STORE_UNCHANGED:
+            if self.output_stats.observe(f"dimmer_{address}", value / 255, time.monotonic()):
+                self._schedule_stats_save()
+
+        if self._pending:
+            self._confirm_pending(f"dimmer_{address}", value)
+        if self._in_flight:
+            self._in_flight.pop(f"dimmer_{address}", None)
+
+        if self._reconcile_seen is not None:
+            self._check_drift(f"dimmer_{address}", result)
+        if result != STORE_UNCHANGED:
             self._notify_listeners(f"dimmer_{address}")
 
+    def _update_input_state(self, address: int, state: bool):
+        self._profile_lap(STAGE_PARSE)
+        result = self._input_states.set(address, 1 if state else 0)
+        if result == STORE_NEW:
+            for cb in self._new_input_callbacks: cb(address)
+
+        # Direct vanuit het ontvangstpad, zodat drukknoppen geen vertraging hebben
+        if result != STORE_UNCHANGED:
+            self._notify_listeners(f"input_{address}")
+        # Events alleen voor echte overgangen: de eerste state uit een GetData dump is geen druk
+        if result == STORE_CHANGED:
+            self._notify_listeners(f"input_event_{address}")
+
+    # --- Passief leren ---
+    async def async_load_learning(self) -> None:
+        if self._learning_store is None:
+            return
+        data = await self._learning_store.async_load()
+        self.learner = ShutterLearner(data)
+
+    def _schedule_learning_save(self) -> None:
+        self._learning_dirty = True
+        self._learning_store.async_delay_save(self._learning_data, LEARNING_SAVE_DELAY)
+
+    def _learning_data(self) -> dict:
+        self._learning_dirty = False
+        return self.learner.as_dict()
+
+    # --- Gebruiksstatistieken ---
+    async def async_load_statistics(self) -> None:
+        if self._stats_store is None:
+            return
+        data = await self._stats_store.async_load()
+        self.output_stats = OutputStatistics(data)
+
+    def _schedule_stats_save(self) -> None:
+        self._stats_dirty = True
+        self._stats_store.async_delay_save(self._stats_data, STATISTICS_SAVE_DELAY)
+
+    def _stats_data(self) -> dict:
+        self._stats_dirty = False
+        return self.output_stats.as_dict(time.monotonic())
+
+    def _stats_need_save(self) -> bool:
+        # Een uitgang die al dagen aan staat levert geen overgangen, maar wel aan-tijd
+        return self._stats_dirty or (self.output_stats is not None and self.output_stats.any_on())
+
+    async def _async_save_statistics(self) -> None:
+        if self._stats_store is not None and self._stats_need_save():
+            await self._stats_store.async_save(self._stats_data())
+
+    async def _async_save_statistics_on_stop(self, event: Event) -> None:
+        await self._async_save_statistics()
+
+    async def statistics_loop(self) -> None:
+        """Sla lopende aan-tijd periodiek op (bij een crash verlies je hooguit één interval)."""
+        while not self._shutdown_requested:
+            await asyncio.sleep(STATISTICS_SAVE_INTERVAL)
+            if self.output_stats is not None and self.output_stats.any_on():
+                await self._stats_store.async_save(self._stats_data())
+
+    # --- Snapshots (scene services) ---
+    async def _async_get_snapshots(self) -> dict:
+        if self._snapshots is None:
+            self._snapshots = {}
+            data = await self._snapshot_store.async_load() or {}
+            for name, item in data.items():
+                try:
+                    self._snapshots[name] = tuple(
+                        (bytes.fromhex(values), bytes.fromhex(known))
+                        for values, known in (item["relays"], item["dimmers"])
+                    )
+                except (KeyError, TypeError, ValueError):
+                    _LOGGER.warning("Ignoring invalid stored snapshot '%s'", name)
+                    continue
+                self._persistent_snapshots.add(name)
+        return self._snapshots
+
+    async def async_take_snapshot(self, name: str, persist: bool = False) -> None:
+        """Leg alle relais en dimmers vast uit het geheugen (geen GetData nodig)."""
+        snapshots = await self._async_get_snapshots()
+        snapshots[name] = (self._relay_states.snapshot(), self._dimmer_states.snapshot())
+        if persist:
+            self._persistent_snapshots.add(name)
+        elif name not in self._persistent_snapshots:
+            return
+        await self._snapshot_store.async_save({
+            key: {
+                "relays": [part.hex() for part in snapshots[key][0]],
+                "dimmers": [part.hex() for part in snapshots[key][1]],
+            }
+            for key in self._persistent_snapshots
+        })
+
+    async def async_restore_snapshot(
+        self, name: str, exclude_relays: set[int], slope: int
+    ) -> int | None:
+        """Stuur alleen de afwijkende uitgangen, in één write.
+
+        Geeft het aantal commando's terug (None als de write mislukte);
+        KeyError voor een onbekende snapshot.
+        """
+        relays, dimmers = (await self._async_get_snapshots())[name]
+        commands: dict[str, bytes] = {}
+        for address in self._relay_states.diff(relays):
+            if address in exclude_relays or not _in_snapshot(relays, address): continue
+            commands[f"relay_{address}"] = encode_set_relay(address, bool(relays[0][address]))
+        for address in self._dimmer_states.diff(dimmers):
+            if not _in_snapshot(dimmers, address): continue
+            commands[f"dimmer_{address}"] = encode_set_dimmer(address, dimmers[0][address], slope)
+        if commands and not await self._async_send_batch(commands):
+            return None
+        return len(commands)
+
+    # --- Optimistische modus ---
+    def expect_state(
+        self, key: str, expected: int, on_timeout, start: int | None = None
+    ) -> None:
+        """Verwacht een echo voor `key`; zonder echo binnen de timeout: rollback.
+
+        Met `start` bevestigt ook een waarde die van `start` richting `expected`
+        beweegt (tussenwaarden van een fade); een ongewijzigde waarde nooit.
+        """
+        self.cancel_expectation(key)
+
+        @callback
+        def _expired() -> None:
+            self._pending.pop(key, None)
+            self.rollback_count += 1
+            _LOGGER.warning(
+                "No confirmation for %s from %s within %ss, rolling back",
+                key, self._host, OPTIMISTIC_TIMEOUT
+            )
+            on_timeout()
+
+        self._pending[key] = (
+            expected, start, self.hass.loop.call_later(OPTIMISTIC_TIMEOUT, _expired)
+        )
+
+    def cancel_expectation(self, key: str) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending[2].cancel()
+
+    def _confirm_pending(self, key: str, value: int) -> None:
+        pending = self._pending.get(key)
+        if pending is None:
+            return
+        expected, start, handle = pending
+        if value == expected or (
+            start is not None and value != start
+            and min(start, expected) <= value <= max(start, expected)
+        ):
+            handle.cancel()
+            del self._pending[key]
+
+    def _check_drift(self, key: str, result: int) -> None:
+        """Wijkt de dump af van de state van vóór GetData, dan misten we een event.
+
+        Alleen de eerste regel per uitgang komt uit de dump; een latere regel
+        voor dezelfde uitgang is een live wijziging (bv. een wandschakelaar).
+        """
+        if key in self._reconcile_seen:
+            return
+        self._reconcile_seen.add(key)
+        if result == STORE_CHANGED:
+            self.drift_count += 1
+
     def get_relay_state(self, address: int) -> bool | None:
-        return self._relay_states.get(address)
+        value = self._relay_states.get(address)
+        return None if value is None else value == 1
 
     def get_dimmer_state(self, address: int) -> int | None:
         return self._dimmer_states.get(address)
 
-    def add_listener(self, key: str, callback_func):
-        self._listeners.setdefault(key, []).append(callback_func)
-        return lambda: self._listeners[key].remove(callback_func)
+    def get_input_state(self, address: int) -> bool | None:
+        value = self._input_states.get(address)
+        return None if value is None else value == 1
+
+    def add_listener(self, key: str, callback_func, throttle: bool = False):
+        """Registreer een listener; met throttle=True wordt de write-rate begrensd.
+
+        Alleen voor listeners die de actuele state opnieuw lezen: tussenliggende
+        waarden (bv. dimmer fades) vallen weg, de laatste wordt altijd geschreven.
+        """
+        if not throttle or not self._throttle_interval:
+            self._listeners.setdefault(key, []).append(callback_func)
+            return lambda: self._listeners[key].remove(callback_func)
+
+        throttled = Throttle(self.hass.loop, self._throttle_interval, callback_func)
+        self._listeners.setdefault(key, []).append(throttled)
+
+        def _remove():
+            throttled.cancel()
+            self._listeners[key].remove(throttled)
+        return _remove
 
     def _notify_listeners(self, key: str):
+        profiler = self._profiler
+        if profiler is not None and profiler.active:
+            self._notify_listeners_profiled(profiler, key)
+            return
         if key in self._listeners:
             for cb in self._listeners[key]: cb()
 
-    async def fetch_initial_states(self) -> None:
-        await self.async_send_command("GetData")
+    def _notify_listeners_profiled(self, profiler: LatencyProfiler, key: str):
+        start = profiler.lap(STAGE_UPDATE)
+        for cb in self._listeners.get(key, []):
+            cb()
+            profiler.lap(STAGE_ENTITY_WRITE)
+        profiler.record(STAGE_NOTIFY, time.perf_counter() - start)
+        profiler.end_line()
 
-    async def async_send_command(self, command: str) -> bool:
+    async def fetch_initial_states(self) -> None:
+        await self._async_send(GET_DATA)
+
+    async def async_wait_initial_sync(
+        self, quiet: float = SYNC_QUIET_TIME, timeout: float = SYNC_TIMEOUT
+    ) -> bool:
+        """Wacht tot een net gevraagde GetData dump verwerkt is (stilte na ontvangst)."""
+        requested = time.monotonic()
+        deadline = requested + timeout
+        while (now := time.monotonic()) < deadline:
+            idle = now - self._last_receive_time
+            if self._last_receive_time >= requested and idle >= quiet:
+                return True
+            await asyncio.sleep(max(0.05, quiet - idle))
+        return False
+
+    @property
+    def reconcile_enabled(self) -> bool:
+        return self._reconcile_interval > 0 and self.full_dumps
+
+    async def reconcile_loop(self) -> None:
+        """Vraag periodiek een volledige state dump op en tel de afwijkingen.
+
+        Alleen echte verschillen triggeren listeners (de state store filtert
+        ongewijzigde waarden). Het interval krimpt na gevonden drift en groeit
+        terug (tot 4x de instelling) zolang de link gezond is.
+        """
+        base = max(RECONCILE_MIN_INTERVAL, self._reconcile_interval)
+        interval = base
+        delay = base
+        while not self._shutdown_requested:
+            await asyncio.sleep(delay)
+            delay = interval
+            if not self._is_connected:
+                continue
+
+            # Geen bandbreedte gebruiken zolang de gebruiker actief stuurt
+            quiet_for = time.monotonic() - self._last_command_time
+            if self._send_lock.locked() or quiet_for < RECONCILE_COMMAND_QUIET:
+                delay = RECONCILE_COMMAND_QUIET
+                continue
+
+            drift_before = self.drift_count
+            self._reconcile_seen = set()
+            try:
+                if not await self._async_send(GET_DATA):
+                    continue
+                self.reconcile_runs += 1
+                # Venster sluit zodra de dump binnen is, zodat live wijzigingen erbuiten vallen
+                await self.async_wait_initial_sync(timeout=RECONCILE_WINDOW)
+            finally:
+                self._reconcile_seen = None
+
+            found = self.drift_count - drift_before
+            if found:
+                _LOGGER.warning("Reconciliation corrected %d missed state change(s)", found)
+                interval = max(RECONCILE_MIN_INTERVAL, base / 4)
+            else:
+                interval = min(base * 4, interval * 2)
+            delay = interval
+
+    async def async_set_relay(self, address: int, state: bool, force: bool = False) -> bool:
+        """Stuur Setrelay, tenzij de bevestigde state al gelijk is (of force=True)."""
+        key = f"relay_{address}"
+        if not force and self._is_redundant(key, self.get_relay_state(address), state):
+            return True
+        return await self._async_send_tracked(key, encode_set_relay(address, state))
+
+    async def async_set_dimmer(self, address: int, value: int, slope: int) -> bool:
+        """Stuur SetDimmer, tenzij de bevestigde waarde al gelijk is."""
+        key = f"dimmer_{address}"
+        if self._is_redundant(key, self.get_dimmer_state(address), value):
+            return True
+        return await self._async_send_tracked(key, encode_set_dimmer(address, value, slope))
+
+    async def async_set_relays(self, states: dict[int, bool], measure_latency: bool = False) -> bool:
+        """Stuur meerdere Setrelay commando's in één write (altijd, zonder onderdrukking).
+
+        Met measure_latency=True (stroomrelais van rolluiken) meten we de tijd
+        van de write tot de echo, voor de compensatie van rolluik stops.
+        """
+        if not states:
+            return True
+        commands = {
+            f"relay_{address}": encode_set_relay(address, state)
+            for address, state in states.items()
+        }
+        return await self._async_send_batch(commands, measure_latency)
+
+    def _expect_echo(self, keys) -> None:
+        """Onthoud wanneer het commando geschreven werd (het wachten op de lock telt niet mee)."""
+        if len(self._echo_wait) > LATENCY_MAX_PENDING:
+            self._echo_wait.clear()
+        now = time.monotonic()
+        for key in keys:
+            self._echo_wait[key] = now
+
+    def _record_echo(self, key: str) -> None:
+        sent_at = self._echo_wait.pop(key, None)
+        if sent_at is None:
+            return
+        sample = time.monotonic() - sent_at
+        if sample > LATENCY_SAMPLE_MAX:
+            return
+        if self.latency_samples:
+            self.command_latency += LATENCY_ALPHA * (sample - self.command_latency)
+        else:
+            self.command_latency = sample
+        self.latency_samples += 1
+
+    async def _async_send_batch(self, commands: dict[str, bytes], measure_latency: bool = False) -> bool:
+        """Commando's per listener key, verstuurd als één write."""
+        if self._suppress_redundant:
+            now = time.monotonic()
+            for key in commands:
+                self._in_flight[key] = now
+        sent = await self._async_send(
+            b"".join(commands.values()), echo_keys=commands if measure_latency else None
+        )
+        if self.journal is not None:
+            for key, payload in commands.items():
+                self._journal_result(key, payload, sent)
+        return sent
+
+    def _is_redundant(self, key: str, confirmed, target) -> bool:
+        """Alleen onderdrukken als we de state echt kennen en er niets onderweg is."""
+        if not self._suppress_redundant or confirmed is None or confirmed != target:
+            return False
+        if not self._is_connected or key in self._pending:
+            return False
+        sent_at = self._in_flight.get(key)
+        if sent_at is not None:
+            if time.monotonic() - sent_at < IN_FLIGHT_TIMEOUT:
+                return False
+            del self._in_flight[key]
+        self.suppressed_commands += 1
+        _LOGGER.debug("Suppressed redundant command for %s (already %s)", key, target)
+        return True
+
+    async def _async_send_tracked(self, key: str, payload: bytes) -> bool:
+        if self._suppress_redundant:
+            self._in_flight[key] = time.monotonic()
+        sent = await self._async_send(payload)
+        if self.journal is not None:
+            self._journal_result(key, payload, sent)
+        return sent
+
+    def _journal_result(self, key: str, payload: bytes, sent: bool) -> None:
+        # Verstuurd: een ouder commando in de journal is achterhaald
+        if sent:
+            self.journal.discard(key)
+        elif not self._shutdown_requested:
+            self.journal.add(key, payload, time.monotonic())
+
+    async def _async_replay_journal(self) -> None:
+        """Verstuur de journal na herauthenticatie; stop-commando's eerst, in één write."""
+        if not self.journal:
+            return
+        entries = self.journal.drain(time.monotonic())
+        if not entries:
+            return
+        if await self._async_send(b"".join(payload for _, _, payload in entries)):
+            _LOGGER.info("Replayed %d journaled commands after reconnect", len(entries))
+        else:
+            self.journal.requeue(entries)
+
+    async def _async_send(self, payload: bytes, echo_keys=None) -> bool:
         if not self._is_connected or not self._writer: return False
         async with self._send_lock:
+            # Bij afsluiten zonder flush vervallen commando's uit de wachtrij
+            if self._shutdown_requested and not self._flush_on_shutdown: return False
+            if not self._writer: return False
             try:
-                self._writer.write(f"{command}\n".encode('ascii'))
+                self._last_command_time = time.monotonic()
+                if self._capture is not None:
+                    self._capture.record(DIR_OUT, payload)
+                self.flight_recorder.record_outbound(payload)
+                if echo_keys: self._expect_echo(echo_keys)
+                self._writer.write(payload)
                 await self._writer.drain()
                 return True
-            except Exception: return False
+            except Exception as err:
+                self.flight_recorder.record_event(f"Send failed: {err!r}")
+                return False
 
     async def disconnect(self):
-        self._is_connected = False
-        if self._writer:
-            try:
-                self._writer.close()
-                await self._writer.wait_closed()
-            except Exception: pass
+        self._set_connected(False)
+        writer = self._writer
         self._writer = None
         self._reader = None
+        if writer:
+            self.flight_recorder.record_event("Disconnected")
+            try:
+                writer.close()
+                await asyncio.wait_for(writer.wait_closed(), timeout=SHUTDOWN_CLOSE_TIMEOUT)
+            except Exception: pass
 
-    async def stop(self):
+    async def stop(self, flush: bool = True):
+        """Sluit deterministisch af: flush/annuleer commando's, stop taken, sluit socket.
+
+        Met flush=True krijgen commando's die al wachten op de send lock nog
+        kort de kans om verstuurd te worden (bv. een stop voor een rolluik).
+        """
         self._shutdown_requested = True
+        self._flush_on_shutdown = flush
+
+        if flush and self._is_connected:
+            try:
+                # De lock is FIFO: als wij hem krijgen, is de wachtrij leeg
+                await asyncio.wait_for(self._send_lock.acquire(), timeout=SHUTDOWN_FLUSH_TIMEOUT)
+                self._send_lock.release()
+            except asyncio.TimeoutError:
+                _LOGGER.debug("Command queue not flushed within %ss", SHUTDOWN_FLUSH_TIMEOUT)
+
+        tasks = [task for task in self._tasks if not task.done()]
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+
         await self.disconnect()
-        await asyncio.sleep(1.0)
+
+        if self._learning_dirty:
+            await self._learning_store.async_save(self._learning_data())
+        await self._async_save_statistics()
+
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_TASK_TIMEOUT)
+            if pending:
+                _LOGGER.warning("%d background task(s) did not stop in time", len(pending))
+
+
+def _in_snapshot(snapshot: tuple[bytes, bytes], address: int) -> bool:
+    known = snapshot[1]
+    return (address >> 3) < len(known) and bool(known[address >> 3] & (1 << (address & 7)))
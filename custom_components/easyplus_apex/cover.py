@@ -12,7 +12,7 @@ from homeassistant.components.cover import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.restore_state import RestoreEntity
@@ -20,9 +20,11 @@ from homeassistant.helpers.restore_state import RestoreEntity
 from .const import (
     DOMAIN, CONF_COVERS, CONF_COVER_NAME, 
     CONF_ADDR_DIR, CONF_ADDR_POWER, 
-    CONF_TRAVEL_TIME, CONF_INVERT_DIR
+    CONF_TRAVEL_TIME, CONF_INVERT_DIR,
+    SIGNAL_OPTIONS_UPDATED
 )
 from .coordinator import EasyplusCoordinator
+from .entity import ConnectionAvailability, async_remove_entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,6 +38,11 @@ STATE_UNKNOWN = "unknown"
 CONTROL_START = 1
 CONTROL_STOP = 0
 
+# Groepsbewegingen
+GROUP_COLLECT_WINDOW = 0.02  # Commando's binnen dit venster vormen één groep
+INTERLOCK_DELAY = 0.15       # Tussen richting en stroom
+STOP_GROUP_WINDOW = 0.005    # Stops die al (bijna) verlopen zijn gaan in één write; nooit vroeg stoppen
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -43,32 +50,165 @@ async def async_setup_entry(
 ) -> None:
     """Set up Easyplus Apex cover platform from config options."""
     coordinator: EasyplusCoordinator = hass.data[DOMAIN][entry.entry_id]
+    mover = CoverGroupMover(hass, coordinator)
+    entry.async_on_unload(mover.cancel)
     
     # Haal de rolluiken uit de configuratie opties (die de Wizard heeft opgeslagen)
     covers_config = entry.options.get(CONF_COVERS, [])
     
-    entities = []
+    entities: dict[str, EasyplusCover] = {}
     for cover_conf in covers_config:
-        entities.append(
-            EasyplusCover(
-                coordinator, 
-                entry, 
-                cover_conf[CONF_COVER_NAME],
-                cover_conf[CONF_ADDR_DIR],
-                cover_conf[CONF_ADDR_POWER],
-                cover_conf[CONF_TRAVEL_TIME],
-                cover_conf.get(CONF_INVERT_DIR, False)
-            )
-        )
+        cover = _create_cover(coordinator, mover, entry, cover_conf)
+        entities[cover.unique_id] = cover
 
     if entities:
-        async_add_entities(entities)
+        async_add_entities(list(entities.values()))
         _LOGGER.info("Added %d Easyplus Apex covers from options", len(entities))
 
+    @callback
+    def async_options_updated(old_options: dict, new_options: dict) -> None:
+        """Voeg rolluiken toe, verwijder of herconfigureer ze zonder reload."""
+        wanted = {}
+        for cover_conf in new_options.get(CONF_COVERS, []):
+            wanted[_cover_unique_id(entry, cover_conf)] = cover_conf
+
+        for unique_id in list(entities):
+            if unique_id not in wanted:
+                hass.async_create_task(async_remove_entity(hass, entities.pop(unique_id)))
+
+        new_entities = []
+        for unique_id, cover_conf in wanted.items():
+            if unique_id in entities:
+                entities[unique_id].apply_config(cover_conf)
+            else:
+                cover = _create_cover(coordinator, mover, entry, cover_conf)
+                entities[unique_id] = cover
+                new_entities.append(cover)
+        if new_entities:
+            async_add_entities(new_entities)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), async_options_updated
+        )
+    )
 
-class EasyplusCover(CoverEntity, RestoreEntity):
-    """Representation of an Easyplus Apex Cover."""
 
+def _cover_unique_id(entry: ConfigEntry, cover_conf: dict) -> str:
+    return f"{entry.entry_id}_cover_{cover_conf[CONF_ADDR_DIR]}_{cover_conf[CONF_ADDR_POWER]}"
+
+
+def _create_cover(coordinator, mover, entry: ConfigEntry, cover_conf: dict) -> "EasyplusCover":
+    return EasyplusCover(
+        coordinator, 
+        mover,
+        entry, 
+        cover_conf[CONF_COVER_NAME],
+        cover_conf[CONF_ADDR_DIR],
+        cover_conf[CONF_ADDR_POWER],
+        cover_conf[CONF_TRAVEL_TIME],
+        cover_conf.get(CONF_INVERT_DIR, False)
+    )
+
+
+class CoverGroupMover:
+    """Bundelt bewegingen van rolluiken die (bijna) tegelijk gestart worden.
+
+    Een cover groep of scène roept async_open_cover per entiteit aan. Alle
+    starts binnen GROUP_COLLECT_WINDOW gaan samen: één write met alle
+    richtingsrelais, één interlock-pauze en één write met alle stroomrelais.
+    Geplande stops delen één timer en worden ook samen verstuurd.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: EasyplusCoordinator) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._starts: dict["EasyplusCover", int] = {}
+        self._starts_done: asyncio.Future | None = None
+        self._stops: dict["EasyplusCover", tuple[float, int | None]] = {}
+        self._stop_unsub = None
+
+    async def async_start(self, cover: "EasyplusCover", direction_value: int) -> bool:
+        """Zet richting en start de motor, samen met de rest van de groep."""
+        self._starts[cover] = direction_value
+        if self._starts_done is None:
+            self._starts_done = self._hass.loop.create_future()
+            self._hass.async_create_task(self._async_flush_starts())
+        return await asyncio.shield(self._starts_done)
+
+    async def _async_flush_starts(self) -> None:
+        done = self._starts_done
+        success = False
+        try:
+            await asyncio.sleep(GROUP_COLLECT_WINDOW)
+            starts = self._starts
+            self._starts, self._starts_done = {}, None
+            success = await self._coordinator.async_set_relays(
+                {cover._direction_addr: value for cover, value in starts.items()}
+            )
+            if success:
+                await asyncio.sleep(INTERLOCK_DELAY)
+                success = await self._coordinator.async_set_relays(
+                    {cover._control_addr: CONTROL_START for cover in starts}, measure_latency=True
+                )
+            if len(starts) > 1:
+                _LOGGER.debug("Started %d covers in one group move", len(starts))
+        finally:
+            # Ook bij annulering tijdens het verzamelen: wachtende rolluiken niet laten hangen
+            if self._starts_done is done:
+                self._starts, self._starts_done = {}, None
+            if not done.done():
+                done.set_result(success)
+
+    def schedule_stop(self, cover: "EasyplusCover", delay: float, final_position: int | None):
+        """Plan een stop; geeft een cancel-functie terug (zoals async_call_later)."""
+        entry = (time.monotonic() + delay, final_position)
+        self._stops[cover] = entry
+
+        def _cancel() -> None:
+            if self._stops.get(cover) is entry:
+                del self._stops[cover]
+                self._reschedule()
+
+        self._reschedule()
+        return _cancel
+
+    def _reschedule(self) -> None:
+        if self._stop_unsub:
+            self._stop_unsub()
+            self._stop_unsub = None
+        if not self._stops:
+            return
+        next_due = min(due for due, _ in self._stops.values())
+        self._stop_unsub = async_call_later(
+            self._hass, max(0.0, next_due - time.monotonic()), self._async_run_stops
+        )
+
+    @callback
+    def _async_run_stops(self, *args) -> None:
+        self._stop_unsub = None
+        limit = time.monotonic() + STOP_GROUP_WINDOW
+        stopped = {}
+        for cover, (due, final_position) in list(self._stops.items()):
+            if due > limit:
+                continue
+            del self._stops[cover]
+            if cover.finish_move(final_position):
+                stopped[cover._control_addr] = CONTROL_STOP
+        if stopped:
+            self._hass.async_create_task(
+                self._coordinator.async_set_relays(stopped, measure_latency=True)
+            )
+        self._reschedule()
+
+    @callback
+    def cancel(self) -> None:
+        self._stops.clear()
+        self._reschedule()
+
+
+class EasyplusCover(ConnectionAvailability, CoverEntity, RestoreEntity):
+    """Representation of an Easyplus Apex Cover."""
     _attr_should_poll = False
     _attr_has_entity_name = True
     _attr_device_class = CoverDeviceClass.SHUTTER
@@ -80,6 +220,7 @@ class EasyplusCover(CoverEntity, RestoreEntity):
     def __init__(
         self,
         coordinator: EasyplusCoordinator,
+        mover: CoverGroupMover,
         config_entry: ConfigEntry,
         name: str,
         direction_addr: int,
@@ -89,9 +230,27 @@ class EasyplusCover(CoverEntity, RestoreEntity):
     ) -> None:
         """Initialize the cover."""
         self.coordinator = coordinator
-        self._config_entry_id = config_entry.entry_id
+        self._mover = mover
         self._direction_addr = direction_addr
         self._control_addr = control_addr
+        self._set_config(name, travel_time, invert_direction)
+        self._attr_unique_id = f"{config_entry.entry_id}_cover_{direction_addr}_{control_addr}"
+
+        self._estimated_position: int | None = None
+        self._assumed_state: str = STATE_UNKNOWN
+        self._last_move_start_time: float | None = None
+        self._start_move_position: int | None = None
+        self._stop_timer_unsub: asyncio.TimerHandle | None = None
+        # Latency compensatie: echo van het stroomrelais en de geplande beweging
+        self._start_requested_at = 0.0
+        self._power_on_at: float | None = None
+        self._move_target: int | None = None
+        self._move_needed = 0.0
+
+        self._attr_device_info = coordinator.device_info
+
+    def _set_config(self, name: str, travel_time: float, invert_direction: bool) -> None:
+        self._attr_name = name
         self._travel_time = max(1.0, float(travel_time))
 
         # Bepaal open/dicht waarden op basis van invert optie
@@ -102,22 +261,21 @@ class EasyplusCover(CoverEntity, RestoreEntity):
             self._open_dir_val = 1
             self._close_dir_val = 0
 
-        self._attr_name = name
-        self._attr_unique_id = f"{config_entry.entry_id}_cover_{direction_addr}_{control_addr}"
-
-        self._estimated_position: int | None = None
-        self._assumed_state: str = STATE_UNKNOWN
-        self._last_move_start_time: float | None = None
-        self._start_move_position: int | None = None
-        self._stop_timer_unsub: asyncio.TimerHandle | None = None
-        self._last_known_direction_state: int | None = None
-        self._last_known_control_state: bool | None = None
-
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, config_entry.entry_id)},
-            name=config_entry.title,
-            manufacturer="Apex Systems International",
+    @callback
+    def apply_config(self, cover_conf: dict) -> None:
+        """Pas naam/looptijd/richting live aan (adressen blijven gelijk)."""
+        # Positie vastleggen met de oude looptijd voor we die wijzigen
+        self._update_estimated_position()
+        if self._is_moving:
+            self._start_move_position = self._estimated_position
+            self._last_move_start_time = time.monotonic()
+        self._set_config(
+            cover_conf[CONF_COVER_NAME],
+            cover_conf[CONF_TRAVEL_TIME],
+            cover_conf.get(CONF_INVERT_DIR, False)
         )
+        if self.hass is not None:
+            self.async_write_ha_state()
 
     # --- Properties & Logica ---
     @property
@@ -144,12 +302,9 @@ class EasyplusCover(CoverEntity, RestoreEntity):
         return pos <= 5
 
     async def _set_direction_and_start(self, direction_value: int) -> bool:
-        """Zet richting en start motor."""
-        success_dir = await self.coordinator.async_send_command(f"Setrelay {self._direction_addr},{direction_value}")
-        if not success_dir: return False
-        await asyncio.sleep(0.15)
-        success_ctrl = await self.coordinator.async_send_command(f"Setrelay {self._control_addr},{CONTROL_START}")
-        return success_ctrl
+        """Zet richting en start motor (gebundeld met andere rolluiken)."""
+        self._start_requested_at = time.monotonic()
+        return await self._mover.async_start(self, direction_value)
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         if self._assumed_state == STATE_CLOSING:
@@ -160,8 +315,9 @@ class EasyplusCover(CoverEntity, RestoreEntity):
             self._start_internal_move(STATE_OPENING)
             full_travel_remaining_time = self._calculate_remaining_time(100)
             if full_travel_remaining_time > 0.1:
-                self._stop_timer_unsub = async_call_later(
-                    self.hass, full_travel_remaining_time, self._async_complete_move
+                # Volledige beweging: niet compenseren, de eindstop geeft een bekende positie
+                self._stop_timer_unsub = self._mover.schedule_stop(
+                    self, full_travel_remaining_time, 100
                 )
         else:
             await self.async_stop_cover()
@@ -175,15 +331,15 @@ class EasyplusCover(CoverEntity, RestoreEntity):
             self._start_internal_move(STATE_CLOSING)
             full_travel_remaining_time = self._calculate_remaining_time(0)
             if full_travel_remaining_time > 0.1:
-                self._stop_timer_unsub = async_call_later(
-                    self.hass, full_travel_remaining_time, self._async_complete_move
+                self._stop_timer_unsub = self._mover.schedule_stop(
+                    self, full_travel_remaining_time, 0
                 )
         else:
             await self.async_stop_cover()
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
         self._stop_internal_move()
-        await self.coordinator.async_send_command(f"Setrelay {self._control_addr},{CONTROL_STOP}")
+        await self.coordinator.async_set_relay(self._control_addr, CONTROL_STOP, force=True)
         self.async_write_ha_state()
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
@@ -207,16 +363,40 @@ class EasyplusCover(CoverEntity, RestoreEntity):
             distance_to_travel = abs(target_position - current_pos)
             time_needed = (distance_to_travel / 100.0) * self._travel_time
             if time_needed > 0.1:
-                self._cancel_stop_timer()
-                self._stop_timer_unsub = async_call_later(
-                    self.hass, time_needed, self._async_stop_cover_callback
-                )
+                self._arm_stop(target_position, time_needed)
             else:
                 await asyncio.sleep(0.1)
                 await self.async_stop_cover()
         else:
             await self.async_stop_cover()
 
+    def _arm_stop(self, target: int, needed: float) -> None:
+        """Plan de stop voor een tussenpositie; gecompenseerd met een verse echo van het stroomrelais."""
+        self._cancel_stop_timer()
+        self._move_target = target
+        self._move_needed = needed
+        if self._power_on_at is not None and self._power_on_at >= self._start_requested_at:
+            self._anchor_to_echo()
+            return
+        # Voorlopig tot de echo (of de motor liep al): de stop zelf is nog een halve round-trip onderweg
+        delay = needed - self.coordinator.command_latency / 2
+        self._stop_timer_unsub = self._mover.schedule_stop(self, max(0.0, delay), target)
+
+    def _anchor_to_echo(self) -> None:
+        """Reken vanaf de echo in plaats van de lokale verzendtijd.
+
+        De motor startte ongeveer een halve round-trip vóór de echo binnenkwam,
+        en de stop heeft ook een halve round-trip nodig: die vertrekt dus
+        een volle round-trip vóór het verwachte einde, gerekend vanaf de echo.
+        """
+        latency = self.coordinator.command_latency
+        echo_at = self._power_on_at
+        self._last_move_start_time = echo_at - latency / 2
+        delay = echo_at + self._move_needed - latency - time.monotonic()
+        self._cancel_stop_timer()
+        self._stop_timer_unsub = self._mover.schedule_stop(self, max(0.0, delay), self._move_target)
+        self._move_target = None
+
     def _start_internal_move(self, direction: str) -> None:
         if self._assumed_state == direction and getattr(self, "_last_move_start_time", None) is not None:
             return
@@ -236,6 +416,7 @@ class EasyplusCover(CoverEntity, RestoreEntity):
         self._assumed_state = STATE_STOPPED
         self._last_move_start_time = None
         self._start_move_position = None
+        self._move_target = None
 
     def _calculate_remaining_time(self, target_position: int) -> float:
         current_pos = self.current_cover_position
@@ -249,19 +430,20 @@ class EasyplusCover(CoverEntity, RestoreEntity):
             self._stop_timer_unsub = None
 
     @callback
-    def _async_complete_move(self, *args):
-        target_pos = 100 if self._assumed_state == STATE_OPENING else (0 if self._assumed_state == STATE_CLOSING else None)
-        if target_pos is not None:
-            self._estimated_position = target_pos
-            self._stop_internal_move()
-            self.hass.async_create_task(
-                self.coordinator.async_send_command(f"Setrelay {self._control_addr},{CONTROL_STOP}")
-            )
-            self.async_write_ha_state()
-
-    @callback
-    def _async_stop_cover_callback(self, *args):
-        self.hass.async_create_task(self.async_stop_cover())
+    def finish_move(self, final_position: int | None) -> bool:
+        """Geplande stop van de mover; geeft True als het stroomrelais uit moet.
+
+        Met final_position (eindpunt bereikt) zetten we de positie vast,
+        anders wordt ze geschat uit de verstreken tijd.
+        """
+        self._stop_timer_unsub = None
+        if final_position is not None:
+            if not self._is_moving:
+                return False
+            self._estimated_position = final_position
+        self._stop_internal_move()
+        self.async_write_ha_state()
+        return True
 
     def _update_estimated_position(self):
         if self._assumed_state not in [STATE_OPENING, STATE_CLOSING]: return
@@ -308,6 +490,15 @@ class EasyplusCover(CoverEntity, RestoreEntity):
                 self._stop_internal_move()
                 self.async_write_ha_state()
 
+        # Echo van het stroomrelais: tijdstip waarop de motor echt startte
+        if ctrl_state:
+            if self._power_on_at is None:
+                self._power_on_at = time.monotonic()
+                if self._move_target is not None and self._is_moving:
+                    self._anchor_to_echo()
+        else:
+            self._power_on_at = None
+
     async def _update_initial_state(self):
         await asyncio.sleep(2.0)
         
@@ -354,6 +545,10 @@ class EasyplusCover(CoverEntity, RestoreEntity):
         self.async_write_ha_state()
         self.hass.async_create_task(self._update_initial_state())
 
+    async def async_will_remove_from_hass(self) -> None:
+        self._cancel_stop_timer()
+        await super().async_will_remove_from_hass()
+
     @property
     def _is_moving(self) -> bool:
         return self._assumed_state in [STATE_OPENING, STATE_CLOSING]
@@ -0,0 +1,56 @@
+"""Diagnostics voor de Easyplus Apex integratie."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_PASSWORD, CONF_XML_CONTENT
+from .coordinator import EasyplusCoordinator
+
+TO_REDACT = {CONF_PASSWORD, CONF_XML_CONTENT}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Config entry, tellers en de inhoud van de flight recorder."""
+    coordinator: EasyplusCoordinator | None = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    result: dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+    }
+    if coordinator is None:
+        return result
+
+    recorder = coordinator.flight_recorder
+    result["coordinator"] = {
+        "connected": coordinator.is_connected,
+        "known_relays": len(coordinator.known_relays),
+        "known_dimmers": len(coordinator.known_dimmers),
+        "known_inputs": len(coordinator.known_inputs),
+        "loaded_platforms": sorted(str(platform) for platform in coordinator.loaded_platforms),
+        "discarded_frames": coordinator.discarded_frames,
+        "frame_errors": coordinator.frame_errors,
+        "reconcile_runs": coordinator.reconcile_runs,
+        "drift_count": coordinator.drift_count,
+        "rollback_count": coordinator.rollback_count,
+        "suppressed_commands": coordinator.suppressed_commands,
+        "last_profile_summary": coordinator.last_profile_summary,
+        "startup_timing": coordinator.startup_timing,
+        "command_latency_ms": round(coordinator.command_latency * 1000, 1),
+        "latency_samples": coordinator.latency_samples,
+        "journal": None if coordinator.journal is None else {
+            "pending": len(coordinator.journal),
+            "dropped": coordinator.journal.dropped,
+            "expired": coordinator.journal.expired,
+        },
+    }
+    result["flight_recorder"] = {
+        "entries": len(recorder),
+        "dropped": recorder.dropped,
+        "log": recorder.as_list(),
+    }
+    return result
@@ -0,0 +1,69 @@
+"""Gedeelde helpers voor de Easyplus Apex entiteiten."""
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+
+from .const import CONF_COVERS, CONF_ADDR_DIR, CONF_ADDR_POWER
+
+
+async def async_remove_entity(hass: HomeAssistant, entity: Entity) -> None:
+    """Verwijder een entiteit uit HA én uit het entity registry."""
+    registry = er.async_get(hass)
+    if entity.entity_id and registry.async_get(entity.entity_id):
+        # Verwijderen uit het registry haalt de entiteit ook uit de state machine
+        registry.async_remove(entity.entity_id)
+    else:
+        await entity.async_remove(force_remove=True)
+
+
+class ConnectionAvailability:
+    """Mixin: een entiteit is beschikbaar zolang de verbinding met de controller staat.
+
+    De coordinator bundelt de state writes bij een verbindingswissel in één ronde.
+    """
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.is_connected
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.add_availability_listener(self.async_write_ha_state)
+        )
+
+
+class EntityBatcher:
+    """Bundelt entiteiten die in dezelfde loop-iteratie ontdekt worden.
+
+    Een GetData dump levert honderden nieuwe adressen in één read; zo worden
+    ze met één async_add_entities per platform toegevoegd.
+    """
+
+    def __init__(self, hass: HomeAssistant, async_add_entities) -> None:
+        self._hass = hass
+        self._async_add_entities = async_add_entities
+        self._pending: list[Entity] = []
+
+    @callback
+    def add(self, entity: Entity) -> None:
+        self._pending.append(entity)
+        if len(self._pending) == 1:
+            self._hass.loop.call_soon(self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        self._async_add_entities(pending)
+
+
+def relays_used_by_covers(options) -> set[int]:
+    """Relais (richting en stroom) die door een rolluik aangestuurd worden."""
+    used = set()
+    for cover in options.get(CONF_COVERS, []):
+        try:
+            used.add(int(cover[CONF_ADDR_DIR]))
+            used.add(int(cover[CONF_ADDR_POWER]))
+        except (ValueError, KeyError):
+            continue
+    return used
@@ -0,0 +1,79 @@
+"""Platform for Easyplus Apex event integration (drukknoppen)."""
+import logging
+
+from homeassistant.components.event import EventDeviceClass, EventEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import (
+    DOMAIN,
+    CONF_NAMING_MAP,
+    CONF_STRICT_MODE,
+    CONF_XML_INPUTS
+)
+from .coordinator import EasyplusCoordinator
+from .entity import EntityBatcher
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_PRESS = "press"
+EVENT_RELEASE = "release"
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up button event entities using the filtered XML list."""
+    coordinator: EasyplusCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    naming_map = entry.options.get(CONF_NAMING_MAP, {})
+    strict_mode = entry.options.get(CONF_STRICT_MODE, False)
+    xml_inputs = entry.options.get(CONF_XML_INPUTS, [])
+    batcher = EntityBatcher(hass, async_add_entities)
+
+    @callback
+    def async_add_button(address: int):
+        # STRICT MODE LOGICA
+        if strict_mode and address not in xml_inputs:
+            return
+
+        name = naming_map.get(f"in_{address}") or f"Apex Input {address}"
+        batcher.add(EasyplusButtonEvent(coordinator, entry, address, name))
+
+    if strict_mode and xml_inputs:
+        for address in xml_inputs:
+            async_add_button(address)
+    else:
+        # Fallback Auto-Discovery
+        coordinator.listen_for_new_inputs(async_add_button)
+        for address in coordinator.known_inputs:
+            async_add_button(address)
+
+
+class EasyplusButtonEvent(EventEntity):
+    """Press/release events of an Easyplus Apex physical input."""
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+    _attr_device_class = EventDeviceClass.BUTTON
+    _attr_event_types = [EVENT_PRESS, EVENT_RELEASE]
+
+    def __init__(self, coordinator, config_entry, address, name):
+        self.coordinator = coordinator
+        self._address = address
+        self._attr_name = f"{name} Button"
+        self._attr_unique_id = f"{config_entry.entry_id}_button_{address}"
+        self._attr_device_info = coordinator.device_info
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        state = self.coordinator.get_input_state(self._address)
+        if state is None: return
+        self._trigger_event(EVENT_PRESS if state else EVENT_RELEASE)
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self.coordinator.add_listener(f"input_event_{self._address}", self._handle_coordinator_update)
+        )
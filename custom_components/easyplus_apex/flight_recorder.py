@@ -0,0 +1,64 @@
+"""Altijd-aan flight recorder voor het protocol (ring buffer in het geheugen).
+
+Houdt de laatste N ontvangen en verstuurde regels en verbindingsgebeurtenissen
+bij, met tijdstempel, zodat een storing achteraf via diagnostics te bekijken
+is zonder debug logging. Een deque met maxlen: vaste geheugengrootte en O(1)
+append.
+"""
+import time
+from collections import deque
+
+DEFAULT_MAX_ENTRIES = 1000
+
+KIND_IN = "in"
+KIND_OUT = "out"
+KIND_EVENT = "event"
+
+_REDACTED_PASS = b"Pass **REDACTED**"
+
+
+class FlightRecorder:
+    """Ring buffer van (tijd, soort, data) records."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._entries: deque[tuple[float, str, bytes | str]] = deque(maxlen=max_entries)
+        self.dropped = 0
+
+    def record_inbound(self, frames: list[bytes]) -> None:
+        """Alle regels uit één read delen dezelfde tijdstempel."""
+        now = time.time()
+        entries = self._entries
+        overflow = len(entries) + len(frames) - entries.maxlen
+        if overflow > 0:
+            self.dropped += min(overflow, len(entries))
+        entries.extend((now, KIND_IN, frame) for frame in frames)
+
+    def record_outbound(self, payload: bytes) -> None:
+        if payload.startswith(b"Pass "):
+            payload = _REDACTED_PASS
+        self._append((time.time(), KIND_OUT, payload))
+
+    def record_event(self, message: str) -> None:
+        self._append((time.time(), KIND_EVENT, message))
+
+    def _append(self, entry: tuple) -> None:
+        if len(self._entries) == self._entries.maxlen:
+            self.dropped += 1
+        self._entries.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def as_list(self) -> list[dict]:
+        """Leesbare kopie (oudste eerst) voor diagnostics."""
+        result = []
+        for timestamp, kind, data in self._entries:
+            if isinstance(data, bytes):
+                data = data.decode("ascii", errors="backslashreplace").rstrip("\n")
+            result.append({
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp))
+                + f".{int(timestamp % 1 * 1000):03d}",
+                "kind": kind,
+                "data": data,
+            })
+        return result
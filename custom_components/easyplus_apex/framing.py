@@ -0,0 +1,45 @@
+"""Regel-framing voor de ruwe bytestroom van de controller."""
+
+READ_CHUNK_SIZE = 65536
+MAX_FRAME_SIZE = 4096  # Langere regels zijn rommel en worden weggegooid
+
+
+class LineFramer:
+    """Splitst binnenkomende chunks in regels met een blijvende restbuffer.
+
+    Accepteert LF, CRLF en losse CR als regeleinde. Regels langer dan
+    `max_frame` worden (tot het volgende regeleinde) weggegooid en geteld.
+    """
+
+    def __init__(self, max_frame: int = MAX_FRAME_SIZE) -> None:
+        self._buffer = b""
+        self._max_frame = max_frame
+        self._discarding = False
+        self.discarded = 0
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        if b"\r" in chunk:
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        frames = (self._buffer + chunk).split(b"\n")
+        rest = frames.pop()
+
+        result = []
+        for frame in frames:
+            if self._discarding:
+                # Staart van een te lange regel
+                self._discarding = False
+                continue
+            if not frame:
+                continue
+            if len(frame) > self._max_frame:
+                self.discarded += 1
+                continue
+            result.append(frame)
+
+        if len(rest) > self._max_frame:
+            if not self._discarding:
+                self.discarded += 1
+            self._discarding = True
+            rest = b""
+        self._buffer = rest
+        return result
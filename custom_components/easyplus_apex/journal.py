@@ -0,0 +1,56 @@
+"""Begrensde journal van commando's die niet verstuurd konden worden.
+
+Tijdens een onderbreking van de sessie gaan commando's anders verloren (ook
+de stop van een rolluik timer). De journal bewaart per uitgang alleen het
+laatste commando (oudere zijn achterhaald), met een TTL, en geeft ze na het
+herverbinden terug met stop-commando's eerst.
+"""
+from collections import OrderedDict
+
+from .protocol import is_stop_command
+
+JOURNAL_MAX_ENTRIES = 256
+JOURNAL_TTL = 30.0
+
+
+class CommandJournal:
+    """Per key (bv. `relay_5`) het laatste niet-verstuurde commando."""
+
+    def __init__(self, max_entries: int = JOURNAL_MAX_ENTRIES, ttl: float = JOURNAL_TTL) -> None:
+        self._entries: OrderedDict[str, tuple[float, bool, bytes]] = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self.dropped = 0
+        self.expired = 0
+
+    def add(self, key: str, payload: bytes, now: float) -> None:
+        # Een nieuwer commando voor dezelfde uitgang vervangt het oude
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self._ttl, is_stop_command(payload), payload)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.dropped += 1
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def drain(self, now: float) -> list[tuple[str, float, bytes]]:
+        """Leeg de journal; geldige entries met stops eerst, verder in volgorde van ontstaan."""
+        live = []
+        for idx, (key, (expires, stop, payload)) in enumerate(self._entries.items()):
+            if expires < now:
+                self.expired += 1
+                continue
+            live.append((not stop, idx, key, expires, payload))
+        self._entries.clear()
+        live.sort()
+        return [(key, expires, payload) for _, _, key, expires, payload in live]
+
+    def requeue(self, entries: list[tuple[str, float, bytes]]) -> None:
+        """Zet gedraineerde entries terug (replay mislukt), zonder hun TTL te verlengen."""
+        for key, expires, payload in entries:
+            if key not in self._entries:
+                self._entries[key] = (expires, is_stop_command(payload), payload)
@@ -0,0 +1,117 @@
+"""Passief leren van rolluik relaisparen en looptijden uit normaal gebruik.
+
+Een rolluik wordt aangestuurd door een richtingsrelais dat vlak vóór het
+stroomrelais schakelt. Door bij elke inschakeling te kijken welke relais net
+daarvoor schakelden, komen paren vanzelf bovendrijven; de aan-tijd van het
+stroomrelais geeft een schatting van de looptijd per richting.
+"""
+from collections import deque
+
+PAIR_WINDOW = 1.5        # Richting moet binnen zoveel seconden vóór de stroom schakelen
+MIN_OBSERVATIONS = 3     # Minimum aantal keer gezien voor een suggestie
+MIN_PAIR_RATIO = 0.6     # Aandeel van de inschakelingen waarbij het paar samen gezien werd
+MAX_DURATIONS = 20       # Bewaarde looptijden per richting
+MIN_TRAVEL_TIME = 3.0
+MAX_TRAVEL_TIME = 180.0
+_RECENT_CHANGES = 16
+
+
+class ShutterLearner:
+    """Houdt correlaties tussen relaisovergangen bij."""
+
+    def __init__(self, data: dict | None = None) -> None:
+        self._recent: deque[tuple[int, float]] = deque(maxlen=_RECENT_CHANGES)
+        self._states: dict[int, bool] = {}
+        self._on_since: dict[int, tuple[float, int | None, bool | None]] = {}
+        self._pairs: dict[int, dict[int, int]] = {}      # stroom -> {richting: aantal}
+        self._on_count: dict[int, int] = {}              # stroom -> aantal inschakelingen
+        self._durations: dict[tuple[int, bool], list[float]] = {}
+        if data:
+            self._load(data)
+
+    def observe(self, address: int, state: bool, now: float) -> bool:
+        """Verwerk een relaisovergang; geeft True als er iets geleerd werd."""
+        learned = False
+        if state:
+            counts = self._pairs.setdefault(address, {})
+            for other, changed_at in self._recent:
+                if other != address and now - changed_at <= PAIR_WINDOW:
+                    counts[other] = counts.get(other, 0) + 1
+            self._on_count[address] = self._on_count.get(address, 0) + 1
+            direction = self._best_direction(address)
+            dir_state = self._states.get(direction) if direction is not None else None
+            self._on_since[address] = (now, direction, dir_state)
+            learned = True
+        else:
+            started = self._on_since.pop(address, None)
+            if started is not None and started[1] is not None and started[2] is not None:
+                duration = now - started[0]
+                if MIN_TRAVEL_TIME <= duration <= MAX_TRAVEL_TIME:
+                    durations = self._durations.setdefault((address, started[2]), [])
+                    durations.append(round(duration, 2))
+                    del durations[:-MAX_DURATIONS]
+                    learned = True
+
+        self._states[address] = state
+        self._recent.append((address, now))
+        return learned
+
+    def _best_direction(self, power: int) -> int | None:
+        counts = self._pairs.get(power)
+        if not counts:
+            return None
+        return max(counts, key=counts.get)
+
+    def _travel_time(self, power: int, dir_state: bool) -> float | None:
+        durations = sorted(self._durations.get((power, dir_state), []))
+        if not durations:
+            return None
+        # Langste typische run = volledige slag (deelbewegingen zijn korter)
+        return durations[min(len(durations) - 1, int(0.9 * len(durations)))]
+
+    def suggestions(self, exclude: set[int]) -> list[dict]:
+        """Paren die vaak genoeg samen gezien zijn, met geschatte looptijden."""
+        result = []
+        for power, counts in self._pairs.items():
+            direction = self._best_direction(power)
+            if direction is None or direction in exclude or power in exclude:
+                continue
+            seen = counts[direction]
+            if seen < MIN_OBSERVATIONS or seen / self._on_count.get(power, seen) < MIN_PAIR_RATIO:
+                continue
+            result.append({
+                "direction": direction,
+                "power": power,
+                "observations": seen,
+                "travel_time_open": self._travel_time(power, True),
+                "travel_time_close": self._travel_time(power, False),
+            })
+        result.sort(key=lambda item: item["direction"])
+        return result
+
+    def as_dict(self) -> dict:
+        return {
+            "pairs": {
+                str(power): {str(d): n for d, n in counts.items()}
+                for power, counts in self._pairs.items()
+            },
+            "on_count": {str(power): n for power, n in self._on_count.items()},
+            "durations": [
+                [power, dir_state, durations]
+                for (power, dir_state), durations in self._durations.items()
+            ],
+        }
+
+    def _load(self, data: dict) -> None:
+        try:
+            self._pairs = {
+                int(power): {int(d): int(n) for d, n in counts.items()}
+                for power, counts in data.get("pairs", {}).items()
+            }
+            self._on_count = {int(p): int(n) for p, n in data.get("on_count", {}).items()}
+            self._durations = {
+                (int(power), bool(dir_state)): [float(d) for d in durations]
+                for power, dir_state, durations in data.get("durations", [])
+            }
+        except (TypeError, ValueError, AttributeError):
+            self._pairs, self._on_count, self._durations = {}, {}, {}
@@ -5,7 +5,6 @@ from typing import Any
 from homeassistant.components.light import LightEntity, ColorMode, ATTR_BRIGHTNESS
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -15,11 +14,12 @@ from .const import (
     CONF_XML_DIMMERS # Nieuw
 )
 from .coordinator import EasyplusCoordinator
+from .entity import ConnectionAvailability, EntityBatcher
+from .protocol import DEFAULT_SLOPE
 
 _LOGGER = logging.getLogger(__name__)
 
 # Constants
-DEFAULT_SLOPE = 10
 EPC_MIN = 60
 EPC_MAX = 255
 HA_MIN = 1
@@ -36,6 +36,7 @@ async def async_setup_entry(
     naming_map = entry.options.get(CONF_NAMING_MAP, {})
     strict_mode = entry.options.get(CONF_STRICT_MODE, False)
     xml_dimmers = entry.options.get(CONF_XML_DIMMERS, [])
+    batcher = EntityBatcher(hass, async_add_entities)
 
     @callback
     def async_add_dimmer(address: int):
@@ -51,7 +52,7 @@ async def async_setup_entry(
         else:
             name = f"Apex Dimmer {address}"
 
-        async_add_entities([EasyplusLight(coordinator, entry, address, name)])
+        batcher.add(EasyplusLight(coordinator, entry, address, name))
 
     # Als we XML gebruiken, itereren we over de dimmer lijst
     if strict_mode and xml_dimmers:
@@ -64,7 +65,7 @@ async def async_setup_entry(
             async_add_dimmer(address)
 
 
-class EasyplusLight(LightEntity):
+class EasyplusLight(ConnectionAvailability, LightEntity):
     """Representation of an Easyplus Apex Dimmer."""
     _attr_should_poll = False
     _attr_has_entity_name = True
@@ -76,37 +77,67 @@ class EasyplusLight(LightEntity):
         self._address = address
         self._attr_name = name
         self._attr_unique_id = f"{config_entry.entry_id}_dimmer_{address}"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, config_entry.entry_id)},
-            name=config_entry.title,
-            manufacturer="Apex Systems International",
-        )
+        self._attr_device_info = coordinator.device_info
+        self._optimistic_value: int | None = None
+
+    def _current_value(self) -> int | None:
+        if self._optimistic_value is not None:
+            return self._optimistic_value
+        return self.coordinator.get_dimmer_state(self._address)
 
     @property
     def brightness(self) -> int | None:
-        val = self.coordinator.get_dimmer_state(self._address)
+        val = self._current_value()
         if val is None or val < EPC_MIN:
             return None
         return int(HA_MIN + (val - EPC_MIN) * ((HA_MAX - HA_MIN) / (EPC_MAX - EPC_MIN)))
 
     @property
     def is_on(self) -> bool | None:
-        val = self.coordinator.get_dimmer_state(self._address)
+        val = self._current_value()
         return val is not None and val >= EPC_MIN
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         ha_bri = kwargs.get(ATTR_BRIGHTNESS, 255)
         epc_bri = int(EPC_MIN + (ha_bri - HA_MIN) * ((EPC_MAX - EPC_MIN) / (HA_MAX - HA_MIN)))
-        await self.coordinator.async_send_command(f"SetDimmer {self._address},{epc_bri},{DEFAULT_SLOPE}")
+        await self._async_set_value(epc_bri)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        await self.coordinator.async_send_command(f"SetDimmer {self._address},0,{DEFAULT_SLOPE}")
+        await self._async_set_value(0)
+
+    async def _async_set_value(self, epc_value: int) -> None:
+        key = f"dimmer_{self._address}"
+        current = self.coordinator.get_dimmer_state(self._address)
+        optimistic = self.coordinator.optimistic and current != epc_value
+        if optimistic:
+            # Bij een fade bevestigt al de eerste tussenwaarde richting het doel;
+            # een ongewijzigde waarde (bv. uit een GetData dump) niet
+            self._optimistic_value = epc_value
+            self.coordinator.expect_state(key, epc_value, self._rollback, start=current)
+            self.async_write_ha_state()
+
+        sent = await self.coordinator.async_set_dimmer(self._address, epc_value, DEFAULT_SLOPE)
+        if optimistic and not sent:
+            self.coordinator.cancel_expectation(key)
+            self._rollback()
+
+    @callback
+    def _rollback(self) -> None:
+        self._optimistic_value = None
+        self.async_write_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
+        self._optimistic_value = None
         self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.add_listener(
+                f"dimmer_{self._address}", self._handle_coordinator_update, throttle=True
+            )
+        )
         self.async_on_remove(
-            self.coordinator.add_listener(f"dimmer_{self._address}", self._handle_coordinator_update)
+            lambda: self.coordinator.cancel_expectation(f"dimmer_{self._address}")
         )
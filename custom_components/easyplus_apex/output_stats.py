@@ -0,0 +1,81 @@
+"""Incrementeel bijgehouden gebruiksstatistieken per uitgang.
+
+Per uitgang (listener key, bv. `relay_12`) tellen we de cumulatieve aan-tijd,
+het aantal inschakelingen en de met het niveau gewogen aan-tijd (voor dimmers:
+seconden op vol vermogen). Elke overgang kost O(1); de lopende periode van een
+uitgang die nu aan staat wordt pas bij het uitlezen meegeteld.
+"""
+
+_ON_SECONDS = 0
+_CYCLES = 1
+_WEIGHTED_SECONDS = 2
+
+
+class OutputStatistics:
+    """Accumulatoren per uitgang."""
+
+    def __init__(self, data: dict | None = None) -> None:
+        self._totals: dict[str, list] = {}                  # key -> [aan-tijd, cycli, gewogen]
+        self._running: dict[str, tuple[float, float]] = {}  # key -> (sinds, niveau 0..1)
+        if data:
+            self._load(data)
+
+    def observe(self, key: str, level: float, now: float) -> bool:
+        """Verwerk een nieuw niveau (0 = uit); geeft True als de totalen wijzigden."""
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = self._totals[key] = [0.0, 0, 0.0]
+        changed = False
+        running = self._running.get(key)
+        if running is not None:
+            since, previous = running
+            if previous > 0:
+                elapsed = now - since
+                totals[_ON_SECONDS] += elapsed
+                totals[_WEIGHTED_SECONDS] += elapsed * previous
+                changed = True
+            elif level > 0:
+                # Alleen echte uit -> aan overgangen (niet de eerste state na opstart)
+                totals[_CYCLES] += 1
+                changed = True
+        self._running[key] = (now, level)
+        return changed
+
+    def totals(self, key: str, now: float) -> tuple[float, int, float] | None:
+        """(aan-tijd, cycli, gewogen aan-tijd) inclusief de lopende periode."""
+        totals = self._totals.get(key)
+        if totals is None:
+            return None
+        on_seconds, cycles, weighted = totals
+        running = self._running.get(key)
+        if running is not None and running[1] > 0:
+            elapsed = now - running[0]
+            on_seconds += elapsed
+            weighted += elapsed * running[1]
+        return on_seconds, cycles, weighted
+
+    def is_on(self, key: str) -> bool:
+        running = self._running.get(key)
+        return running is not None and running[1] > 0
+
+    def any_on(self) -> bool:
+        """Loopt er aan-tijd die nog niet opgeslagen is?"""
+        return any(level > 0 for _, level in self._running.values())
+
+    def as_dict(self, now: float) -> dict:
+        """Totalen inclusief lopende periodes (die na een herstart opnieuw starten)."""
+        return {
+            "totals": {
+                key: [round(value, 3) for value in self.totals(key, now)]
+                for key in self._totals
+            }
+        }
+
+    def _load(self, data: dict) -> None:
+        try:
+            self._totals = {
+                str(key): [float(on_seconds), int(cycles), float(weighted)]
+                for key, (on_seconds, cycles, weighted) in data.get("totals", {}).items()
+            }
+        except (TypeError, ValueError, AttributeError):
+            self._totals = {}
@@ -0,0 +1,85 @@
+"""Optionele latency profiler voor het pad socket -> parser -> HA state."""
+import time
+from collections import deque
+
+STAGE_READ = "read"                  # Geblokkeerd in read() + framing van de chunk
+STAGE_PARSE = "parse"                # decode_frame
+STAGE_UPDATE = "update"              # _update_relay_state / _update_dimmer_state
+STAGE_NOTIFY = "notify"              # Volledige fan-out in _notify_listeners
+STAGE_ENTITY_WRITE = "entity_write"  # Eén listener callback (async_write_ha_state)
+
+STAGES = (STAGE_READ, STAGE_PARSE, STAGE_UPDATE, STAGE_NOTIFY, STAGE_ENTITY_WRITE)
+
+DEFAULT_SAMPLE_EVERY = 10
+MAX_SAMPLES = 2048
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class LatencyProfiler:
+    """Meet per stage de duur van een steekproef van ontvangen regels.
+
+    Alleen één op `sample_every` reads wordt gemeten (met alle regels uit die
+    read); voor de overige reads kost de profiler enkel een teller en een
+    attribuut-check.
+    """
+
+    def __init__(self, sample_every: int = DEFAULT_SAMPLE_EVERY, max_samples: int = MAX_SAMPLES) -> None:
+        self._sample_every = max(1, sample_every)
+        self._counter = 0
+        self._mark = 0.0
+        self._samples: dict[str, deque[float]] = {
+            stage: deque(maxlen=max_samples) for stage in STAGES
+        }
+        self.active = False
+        self.last_stage: str | None = None
+        self.lines = 0
+
+    def start_line(self) -> bool:
+        """Bepaal of de volgende regel gemeten wordt en start de klok."""
+        self._counter += 1
+        self.active = self._counter % self._sample_every == 0
+        if self.active:
+            self.lines += 1
+            self.last_stage = None
+            self._mark = time.perf_counter()
+        return self.active
+
+    def resume(self) -> None:
+        """Meet de volgende regel uit dezelfde gesamplede read."""
+        self.active = True
+        self.last_stage = None
+        self._mark = time.perf_counter()
+
+    def lap(self, stage: str) -> float:
+        """Registreer de tijd sinds de vorige lap onder `stage`."""
+        now = time.perf_counter()
+        self._samples[stage].append(now - self._mark)
+        self._mark = now
+        self.last_stage = stage
+        return now
+
+    def record(self, stage: str, seconds: float) -> None:
+        self._samples[stage].append(seconds)
+
+    def end_line(self) -> None:
+        self.active = False
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Percentielen per stage in milliseconden."""
+        result = {}
+        for stage, samples in self._samples.items():
+            if not samples:
+                continue
+            values = sorted(samples)
+            result[stage] = {
+                "count": len(values),
+                "p50_ms": round(_percentile(values, 50) * 1000, 3),
+                "p90_ms": round(_percentile(values, 90) * 1000, 3),
+                "p99_ms": round(_percentile(values, 99) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        return result
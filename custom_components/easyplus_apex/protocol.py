@@ -0,0 +1,131 @@
+"""Codec voor het Easyplus Apex tekstprotocol.
+
+Eén plek voor alle protocolkennis: de `>Ready`/`Pass` handshake, encoders
+voor uitgaande commando's (op basis van vooraf ge-encodeerde templates) en
+een decoder die ontvangen regels omzet naar getypeerde events.
+"""
+import asyncio
+from functools import lru_cache
+from typing import NamedTuple
+
+# --- Handshake ---
+READY_PROMPT = b">Ready"
+BANNER_MAX_LINES = 10
+BANNER_LINE_TIMEOUT = 2
+AUTH_SETTLE_TIME = 0.5
+
+
+class HandshakeError(Exception):
+    """De controller gaf geen geldige handshake."""
+
+
+class NoReadyPrompt(HandshakeError):
+    """Geen `>Ready` prompt ontvangen."""
+
+
+class AuthRejected(HandshakeError):
+    """De controller sloot de verbinding na het wachtwoord."""
+
+
+async def async_handshake(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, password: str
+) -> None:
+    """Wacht op `>Ready`, stuur het wachtwoord en controleer of de sessie blijft.
+
+    Leest na het wachtwoord geen data, zodat de eerste events voor de
+    receive loop in de buffer blijven.
+    """
+    for _ in range(BANNER_MAX_LINES):
+        line = await asyncio.wait_for(reader.readuntil(b"\n"), timeout=BANNER_LINE_TIMEOUT)
+        if READY_PROMPT in line:
+            break
+    else:
+        raise NoReadyPrompt("Did not receive '>Ready' prompt.")
+
+    writer.write(encode_pass(password))
+    await writer.drain()
+    await asyncio.sleep(AUTH_SETTLE_TIME)
+    if reader.at_eof():
+        raise AuthRejected("Connection closed after password.")
+
+
+# --- Encoders ---
+GET_DATA = b"GetData\n"
+_SET_RELAY = b"Setrelay %d,%d\n"
+_SET_DIMMER = b"SetDimmer %d,%d,%d\n"
+DEFAULT_SLOPE = 10
+
+
+def encode_pass(password: str) -> bytes:
+    return b"Pass " + password.encode("ascii") + b"\n"
+
+
+@lru_cache(maxsize=2048)
+def encode_set_relay(address: int, state: bool) -> bytes:
+    return _SET_RELAY % (address, 1 if state else 0)
+
+
+def encode_set_dimmer(address: int, value: int, slope: int) -> bytes:
+    return _SET_DIMMER % (address, value, slope)
+
+
+def is_stop_command(payload: bytes) -> bool:
+    """Zet dit commando een uitgang uit (`Setrelay n,0` of `SetDimmer n,0,s`)?"""
+    cmd, _, params = payload.strip().partition(b" ")
+    p = params.split(b",")
+    if cmd == b"Setrelay":
+        return len(p) == 2 and p[1] == b"0"
+    if cmd == b"SetDimmer":
+        return len(p) == 3 and p[1] == b"0"
+    return False
+
+
+# --- Decoder ---
+class RelayEvent(NamedTuple):
+    address: int
+    state: bool
+
+
+class DimmerEvent(NamedTuple):
+    address: int
+    value: int
+
+
+class InputEvent(NamedTuple):
+    address: int
+    state: bool
+
+
+ProtocolEvent = RelayEvent | DimmerEvent | InputEvent
+
+
+def _decode_address(address: bytes) -> int:
+    value = int(address)
+    if value < 0:
+        raise ValueError(f"Invalid address: {value}")
+    return value
+
+
+def _decode_on_off(address: bytes, value: bytes) -> tuple[int, bool]:
+    return _decode_address(address), value == b"ON"
+
+
+def decode_frame(frame: bytes) -> ProtocolEvent | None:
+    """Zet één ontvangen regel om naar een event (None voor onbekend/ongeldig)."""
+    frame = frame.strip()
+    if not frame.startswith(b">"):
+        return None
+    cmd, _, params = frame[1:].partition(b" ")
+    p = params.split(b",")
+    if len(p) != 2:
+        return None
+    try:
+        if cmd == b"DigitalOut":
+            return RelayEvent(*_decode_on_off(p[0], p[1]))
+        if cmd == b"AnalogOut":
+            return DimmerEvent(_decode_address(p[0]), int(p[1]))
+        if cmd == b"DigitalIn":
+            return InputEvent(*_decode_on_off(p[0], p[1]))
+    except ValueError:
+        return None
+    return None
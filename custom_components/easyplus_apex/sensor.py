@@ -0,0 +1,146 @@
+"""Platform for Easyplus Apex usage statistics (on-time and switching cycles)."""
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    DOMAIN,
+    CONF_NAMING_MAP,
+    CONF_STRICT_MODE,
+    CONF_XML_SWITCHES,
+    CONF_XML_DIMMERS,
+)
+from .coordinator import EasyplusCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Uitgangen die aan staan krijgen hun aan-tijd zo vaak bijgewerkt
+RUNNING_REFRESH_INTERVAL = timedelta(minutes=5)
+
+STAT_ON_TIME = "on_time"
+STAT_CYCLES = "cycles"
+STAT_FULL_LOAD_TIME = "full_load_time"
+
+STAT_NAMES = {
+    STAT_ON_TIME: "on time",
+    STAT_CYCLES: "cycles",
+    STAT_FULL_LOAD_TIME: "full load time",
+}
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up usage statistic sensors for relays and dimmers."""
+    coordinator: EasyplusCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if coordinator.output_stats is None:
+        return
+
+    naming_map = entry.options.get(CONF_NAMING_MAP, {})
+    strict_mode = entry.options.get(CONF_STRICT_MODE, False)
+    # Per uitgang de sensoren waarvan de waarde met de tijd oploopt
+    time_sensors: dict[str, list[EasyplusOnTimeSensor]] = {}
+
+    def _add(key: str, name: str, stats: tuple[str, ...]) -> None:
+        if key in time_sensors: return
+        time_sensors[key] = [
+            EasyplusOnTimeSensor(coordinator, entry, key, name, stat)
+            for stat in stats if stat != STAT_CYCLES
+        ]
+        async_add_entities(
+            time_sensors[key] + [EasyplusCyclesSensor(coordinator, entry, key, name, STAT_CYCLES)]
+        )
+
+    @callback
+    def async_add_relay(address: int):
+        if strict_mode and address not in entry.options.get(CONF_XML_SWITCHES, []): return
+        name = naming_map.get(str(address)) or f"Apex Relay {address}"
+        _add(f"relay_{address}", name, (STAT_ON_TIME,))
+
+    @callback
+    def async_add_dimmer(address: int):
+        if strict_mode and address not in entry.options.get(CONF_XML_DIMMERS, []): return
+        name = naming_map.get(str(address)) or f"Apex Dimmer {address}"
+        _add(f"dimmer_{address}", name, (STAT_ON_TIME, STAT_FULL_LOAD_TIME))
+
+    coordinator.listen_for_new_relays(async_add_relay)
+    coordinator.listen_for_new_dimmers(async_add_dimmer)
+    for address in coordinator.known_relays:
+        async_add_relay(address)
+    for address in coordinator.known_dimmers:
+        async_add_dimmer(address)
+
+    @callback
+    def async_refresh_running(now) -> None:
+        """Aan-tijd loopt ook zonder events door: alleen uitgangen die aan staan."""
+        stats = coordinator.output_stats
+        for key, sensors in time_sensors.items():
+            if not stats.is_on(key): continue
+            for sensor in sensors:
+                if sensor.hass is not None: sensor.async_write_ha_state()
+
+    entry.async_on_unload(
+        async_track_time_interval(hass, async_refresh_running, RUNNING_REFRESH_INTERVAL)
+    )
+
+
+class EasyplusStatisticSensor(SensorEntity):
+    """Basis voor een statistiek van één uitgang."""
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator, config_entry, key, name, stat):
+        self.coordinator = coordinator
+        self._key = key
+        self._attr_name = f"{name} {STAT_NAMES[stat]}"
+        self._attr_unique_id = f"{config_entry.entry_id}_{key}_{stat}"
+        self._attr_device_info = coordinator.device_info
+
+    def _totals(self) -> tuple[float, int, float] | None:
+        return self.coordinator.output_stats.totals(self._key, time.monotonic())
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self.coordinator.add_listener(self._key, self.async_write_ha_state, throttle=True)
+        )
+
+
+class EasyplusOnTimeSensor(EasyplusStatisticSensor):
+    """Cumulatieve aan-tijd (of gewogen naar dimniveau) in uren."""
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+    _attr_suggested_display_precision = 2
+
+    def __init__(self, coordinator, config_entry, key, name, stat):
+        super().__init__(coordinator, config_entry, key, name, stat)
+        self._index = 2 if stat == STAT_FULL_LOAD_TIME else 0
+
+    @property
+    def native_value(self) -> float | None:
+        totals = self._totals()
+        if totals is None:
+            return None
+        return round(totals[self._index] / 3600, 4)
+
+
+class EasyplusCyclesSensor(EasyplusStatisticSensor):
+    """Aantal inschakelingen."""
+
+    @property
+    def native_value(self) -> int | None:
+        totals = self._totals()
+        return None if totals is None else totals[1]
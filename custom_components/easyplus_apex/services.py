@@ -0,0 +1,200 @@
+"""Services voor de Easyplus Apex integratie."""
+import logging
+import time
+from pathlib import Path
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN
+from .capture import CAPTURE_SUFFIX, async_replay
+from .entity import relays_used_by_covers
+from .profiler import DEFAULT_SAMPLE_EVERY
+from .protocol import DEFAULT_SLOPE
+from .coordinator import EasyplusCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_PATH = "path"
+ATTR_REALTIME = "realtime"
+ATTR_SAMPLE_EVERY = "sample_every"
+ATTR_NAME = "name"
+ATTR_PERSIST = "persist"
+
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_REPLAY_CAPTURE = "replay_capture"
+SERVICE_START_PROFILING = "start_profiling"
+SERVICE_STOP_PROFILING = "stop_profiling"
+SERVICE_SNAPSHOT_OUTPUTS = "snapshot_outputs"
+SERVICE_RESTORE_OUTPUTS = "restore_outputs"
+
+ENTRY_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+
+REPLAY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ENTRY_ID): cv.string,
+    vol.Required(ATTR_PATH): cv.string,
+    vol.Optional(ATTR_REALTIME, default=False): cv.boolean,
+})
+
+PROFILING_SCHEMA = ENTRY_SCHEMA.extend({
+    vol.Optional(ATTR_SAMPLE_EVERY, default=DEFAULT_SAMPLE_EVERY): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=10000)
+    ),
+})
+
+
+SNAPSHOT_SCHEMA = ENTRY_SCHEMA.extend({
+    vol.Required(ATTR_NAME): cv.string,
+    vol.Optional(ATTR_PERSIST, default=False): cv.boolean,
+})
+
+RESTORE_SCHEMA = ENTRY_SCHEMA.extend({
+    vol.Required(ATTR_NAME): cv.string,
+})
+
+
+def _get_coordinators(hass: HomeAssistant, call: ServiceCall) -> list[EasyplusCoordinator]:
+    """Geef de coordinator van entry_id terug, of alle coordinators."""
+    coordinators = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_ENTRY_ID)
+    if entry_id is None:
+        return list(coordinators.values())
+    if entry_id not in coordinators:
+        raise HomeAssistantError(f"Unknown Easyplus Apex entry: {entry_id}")
+    return [coordinators[entry_id]]
+
+
+def _output_states(coordinator: EasyplusCoordinator) -> dict[str, dict[str, int | bool | None]]:
+    """Alle bekende uitgangen en ingangen per adres (string keys, voor de service response)."""
+    return {
+        "relays": {str(a): coordinator.get_relay_state(a) for a in coordinator.known_relays},
+        "dimmers": {str(a): coordinator.get_dimmer_state(a) for a in coordinator.known_dimmers},
+        "inputs": {str(a): coordinator.get_input_state(a) for a in coordinator.known_inputs},
+    }
+
+
+def _diff_states(replayed: dict, live: dict) -> dict[str, dict[str, dict]]:
+    """Adressen waar de replay afwijkt van de live coordinator."""
+    return {
+        kind: {
+            address: {"replay": value, "live": live[kind].get(address)}
+            for address, value in values.items() if live[kind].get(address) != value
+        }
+        for kind, values in replayed.items()
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Registreer de domein services (eenmalig)."""
+    if hass.services.has_service(DOMAIN, SERVICE_START_CAPTURE):
+        return
+
+    async def async_start_capture(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call):
+            coordinator.start_capture()
+
+    async def async_stop_capture(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call):
+            capture = coordinator.stop_capture()
+            if capture is None:
+                continue
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            entry_id = coordinator._entry.entry_id
+            path = Path(hass.config.path(f"easyplus_apex_{entry_id}_{stamp}{CAPTURE_SUFFIX}"))
+            await hass.async_add_executor_job(path.write_bytes, capture.getvalue())
+            _LOGGER.info("Protocol capture written to %s", path)
+
+    async def async_replay_capture(call: ServiceCall) -> ServiceResponse:
+        live = _get_coordinators(hass, call)[0]
+        path = call.data[ATTR_PATH]
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Path not allowed: {path}")
+        data = await hass.async_add_executor_job(Path(path).read_bytes)
+        # Losse coordinator met dezelfde instellingen: eigen stores en framer, geen
+        # entiteiten of listeners, geen leer- of statistiekdata en geen verbinding
+        coordinator = EasyplusCoordinator(hass, live._entry)
+        processing = 0.0
+
+        def _feed(chunk: bytes) -> None:
+            nonlocal processing
+            start = time.perf_counter()
+            coordinator._process_frames(coordinator._framer.feed(chunk))
+            processing += time.perf_counter() - start
+
+        started = time.perf_counter()
+        try:
+            count = await async_replay(data, _feed, realtime=call.data[ATTR_REALTIME])
+        except ValueError as err:
+            raise HomeAssistantError(f"Invalid capture file: {err}") from err
+        elapsed = time.perf_counter() - started
+
+        states = _output_states(coordinator)
+        diff = _diff_states(states, _output_states(live))
+        _LOGGER.info(
+            "Replayed %d records from %s in %.3fs (%.3fs processing): %d relays, %d dimmers, "
+            "%d inputs, %d differ from live, %d frame errors, %d discarded frames",
+            count, path, elapsed, processing, len(states["relays"]), len(states["dimmers"]),
+            len(states["inputs"]), sum(len(items) for items in diff.values()),
+            coordinator.frame_errors, coordinator.discarded_frames
+        )
+        _LOGGER.debug("Replay differences from live state: %s", diff)
+        return {
+            "records": count,
+            "elapsed_s": round(elapsed, 6),
+            "processing_s": round(processing, 6),
+            "frame_errors": coordinator.frame_errors,
+            "discarded_frames": coordinator.discarded_frames,
+            "states": states,
+            "diff": diff,
+        }
+
+    async def async_start_profiling(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call):
+            coordinator.start_profiling(call.data[ATTR_SAMPLE_EVERY])
+
+    async def async_stop_profiling(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call):
+            coordinator.stop_profiling()
+
+    async def async_snapshot_outputs(call: ServiceCall) -> None:
+        for coordinator in _get_coordinators(hass, call):
+            await coordinator.async_take_snapshot(call.data[ATTR_NAME], call.data[ATTR_PERSIST])
+
+    async def async_restore_outputs(call: ServiceCall) -> None:
+        name = call.data[ATTR_NAME]
+        for coordinator in _get_coordinators(hass, call):
+            # Rolluik relais nooit herstellen: dat zou motoren starten zonder stop timer
+            exclude = relays_used_by_covers(coordinator._entry.options)
+            try:
+                count = await coordinator.async_restore_snapshot(name, exclude, DEFAULT_SLOPE)
+            except KeyError as err:
+                raise HomeAssistantError(f"Unknown snapshot: {name}") from err
+            if count is None:
+                raise HomeAssistantError(f"Could not restore snapshot {name}: not connected")
+            _LOGGER.info("Restored snapshot '%s': %d outputs changed", name, count)
+
+    hass.services.async_register(DOMAIN, SERVICE_START_CAPTURE, async_start_capture, schema=ENTRY_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_CAPTURE, async_stop_capture, schema=ENTRY_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, SERVICE_REPLAY_CAPTURE, async_replay_capture,
+        schema=REPLAY_SCHEMA, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(DOMAIN, SERVICE_START_PROFILING, async_start_profiling, schema=PROFILING_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_PROFILING, async_stop_profiling, schema=ENTRY_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_SNAPSHOT_OUTPUTS, async_snapshot_outputs, schema=SNAPSHOT_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_RESTORE_OUTPUTS, async_restore_outputs, schema=RESTORE_SCHEMA)
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Verwijder de domein services als er geen entries meer zijn."""
+    for service in (
+        SERVICE_START_CAPTURE, SERVICE_STOP_CAPTURE, SERVICE_REPLAY_CAPTURE,
+        SERVICE_START_PROFILING, SERVICE_STOP_PROFILING,
+        SERVICE_SNAPSHOT_OUTPUTS, SERVICE_RESTORE_OUTPUTS,
+    ):
+        hass.services.async_remove(DOMAIN, service)
@@ -0,0 +1,62 @@
+"""Gespreide opstart van meerdere controllers (domein-breed).
+
+Bij een herstart van HA verbinden alle config entries tegelijk, doen ze elk
+de handshake en komen alle GetData dumps samen binnen. De scheduler laat maar
+een beperkt aantal controllers tegelijk verbinden en synchroniseren, in
+volgorde van prioriteit (laag eerst).
+"""
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+
+MAX_CONCURRENT_STARTUPS = 2
+
+
+class StartupScheduler:
+    """Prioriteitsgestuurde semafoor voor de opstart van controllers."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_STARTUPS) -> None:
+        self._max_concurrent = max(1, max_concurrent)
+        self._active = 0
+        self._waiting: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatch_scheduled = False
+
+    @asynccontextmanager
+    async def slot(self, priority: int = 0):
+        """Wacht op een opstartplaats; entries die in dezelfde tick aanvragen worden op prioriteit gesorteerd."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiting, (priority, next(self._seq), future))
+        self._schedule_dispatch(loop)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Plaats al toegekend maar nooit gebruikt: teruggeven
+            if future.done() and not future.cancelled():
+                self._release(loop)
+            raise
+        try:
+            yield
+        finally:
+            self._release(loop)
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._active -= 1
+        self._schedule_dispatch(loop)
+
+    def _schedule_dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Uitgesteld tot de volgende iteratie, zodat gelijktijdige aanvragen eerst binnen zijn
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+
+    def _dispatch(self) -> None:
+        self._dispatch_scheduled = False
+        while self._waiting and self._active < self._max_concurrent:
+            _, _, future = heapq.heappop(self._waiting)
+            if future.done():
+                continue  # Geannuleerd tijdens het wachten
+            self._active += 1
+            future.set_result(None)
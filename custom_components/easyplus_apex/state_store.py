@@ -0,0 +1,86 @@
+"""Compacte state opslag voor uitgangen, geïndexeerd op adres."""
+
+# Resultaat van OutputStateStore.set()
+STORE_UNCHANGED = 0
+STORE_CHANGED = 1
+STORE_NEW = 2
+
+_INITIAL_SIZE = 256
+# Hoogste geldige adres: een verminkt adres mag geen honderden MB alloceren
+MAX_ADDRESS = 4095
+
+
+class OutputStateStore:
+    """Bytearray-gebaseerde opslag van 8-bit waarden per adres.
+
+    Naast de waarden houden we een `known` bitmap bij (adres is ooit gezien).
+    Gedraagt zich als een set van bekende adressen (`in`, iteratie, len).
+    Wijzigingen blijken uit het resultaat van set().
+    """
+
+    __slots__ = ("_values", "_known", "_count")
+
+    def __init__(self, size: int = _INITIAL_SIZE) -> None:
+        self._values = bytearray(size)
+        self._known = bytearray((size + 7) >> 3)
+        self._count = 0
+
+    def _grow(self, address: int) -> None:
+        size = min(max(address + 1, len(self._values) * 2), MAX_ADDRESS + 1)
+        self._values.extend(bytes(size - len(self._values)))
+        self._known.extend(bytes(((size + 7) >> 3) - len(self._known)))
+
+    def __contains__(self, address: int) -> bool:
+        if address < 0 or address >= len(self._values):
+            return False
+        return bool(self._known[address >> 3] & (1 << (address & 7)))
+
+    def __iter__(self):
+        known = self._known
+        for idx, byte in enumerate(known):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield (idx << 3) | bit
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, address: int) -> int | None:
+        if address not in self:
+            return None
+        return self._values[address]
+
+    def set(self, address: int, value: int) -> int:
+        """Zet een waarde; geeft STORE_NEW, STORE_CHANGED of STORE_UNCHANGED."""
+        if address < 0 or address > MAX_ADDRESS:
+            raise ValueError(f"Invalid address: {address}")
+        if address >= len(self._values):
+            self._grow(address)
+        idx = address >> 3
+        bit = 1 << (address & 7)
+        if not self._known[idx] & bit:
+            self._known[idx] |= bit
+            self._values[address] = value
+            self._count += 1
+            return STORE_NEW
+        if self._values[address] == value:
+            return STORE_UNCHANGED
+        self._values[address] = value
+        return STORE_CHANGED
+
+    def snapshot(self) -> tuple[bytes, bytes]:
+        """Goedkope kopie van (waarden, known bitmap)."""
+        return bytes(self._values), bytes(self._known)
+
+    def diff(self, snapshot: tuple[bytes, bytes]) -> list[int]:
+        """Adressen die bekend zijn in de store en afwijken van `snapshot`."""
+        values, known = snapshot
+        result = []
+        for address in self:
+            if address >= len(values) or not known[address >> 3] & (1 << (address & 7)):
+                result.append(address)
+            elif values[address] != self._values[address]:
+                result.append(address)
+        return result
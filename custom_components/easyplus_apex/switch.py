@@ -5,19 +5,21 @@ from typing import Any
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
     DOMAIN, 
-    CONF_COVERS, 
-    CONF_ADDR_DIR, 
-    CONF_ADDR_POWER,
     CONF_NAMING_MAP,
     CONF_STRICT_MODE,
-    CONF_XML_SWITCHES # Nieuw
+    CONF_XML_SWITCHES, # Nieuw
+    SIGNAL_OPTIONS_UPDATED
 )
 from .coordinator import EasyplusCoordinator
+from .entity import (
+    ConnectionAvailability, EntityBatcher, async_remove_entity,
+    relays_used_by_covers
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,19 +37,15 @@ async def async_setup_entry(
     xml_switches = entry.options.get(CONF_XML_SWITCHES, [])
 
     # Relais in gebruik door rolluiken (voor de zekerheid)
-    used_by_covers = set()
-    covers_config = entry.options.get(CONF_COVERS, [])
-    for cover in covers_config:
-        try:
-            used_by_covers.add(int(cover[CONF_ADDR_DIR]))
-            used_by_covers.add(int(cover[CONF_ADDR_POWER]))
-        except (ValueError, KeyError):
-            continue
+    used_by_covers = relays_used_by_covers(entry.options)
+    entities: dict[int, EasyplusSwitch] = {}
+    batcher = EntityBatcher(hass, async_add_entities)
 
     @callback
     def async_add_switch(address: int):
         # 1. Check Rolluiken
         if address in used_by_covers: return
+        if address in entities: return
 
         # 2. STRICT MODE LOGICA
         if strict_mode:
@@ -63,7 +61,8 @@ async def async_setup_entry(
         else:
             name = f"Apex Relay {address}"
 
-        async_add_entities([EasyplusSwitch(coordinator, entry, address, name)])
+        entities[address] = EasyplusSwitch(coordinator, entry, address, name)
+        batcher.add(entities[address])
 
     # Als we Strict Mode (XML) gebruiken, itereren we direct over de schone lijst
     if strict_mode and xml_switches:
@@ -75,8 +74,29 @@ async def async_setup_entry(
         for address in coordinator.known_relays:
             async_add_switch(address)
 
+    @callback
+    def async_options_updated(old_options: dict, new_options: dict) -> None:
+        """Rolluiken gewijzigd: relais vrijgeven of aan een rolluik toewijzen."""
+        used_by_covers.clear()
+        used_by_covers.update(relays_used_by_covers(new_options))
+
+        for address in list(entities):
+            if address in used_by_covers:
+                hass.async_create_task(async_remove_entity(hass, entities.pop(address)))
+
+        # Vrijgekomen relais worden weer gewone schakelaars
+        candidates = xml_switches if strict_mode and xml_switches else list(coordinator.known_relays)
+        for address in candidates:
+            async_add_switch(address)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), async_options_updated
+        )
+    )
+
 
-class EasyplusSwitch(SwitchEntity):
+class EasyplusSwitch(ConnectionAvailability, SwitchEntity):
     """Representation of an Easyplus Apex Switch."""
     _attr_should_poll = False
     _attr_has_entity_name = True
@@ -86,27 +106,55 @@ class EasyplusSwitch(SwitchEntity):
         self._address = address
         self._attr_name = name
         self._attr_unique_id = f"{config_entry.entry_id}_relay_{address}"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, config_entry.entry_id)},
-            name=config_entry.title,
-            manufacturer="Apex Systems International",
-        )
+        self._attr_device_info = coordinator.device_info
+        self._optimistic_state: bool | None = None
 
     @property
     def is_on(self) -> bool | None:
+        if self._optimistic_state is not None:
+            return self._optimistic_state
         return self.coordinator.get_relay_state(self._address)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
-        await self.coordinator.async_send_command(f"Setrelay {self._address},1")
+        await self._async_set_state(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        await self.coordinator.async_send_command(f"Setrelay {self._address},0")
+        await self._async_set_state(False)
+
+    async def _async_set_state(self, state: bool) -> None:
+        key = f"relay_{self._address}"
+        optimistic = (
+            self.coordinator.optimistic
+            and self.coordinator.get_relay_state(self._address) != state
+        )
+        if optimistic:
+            # Eerst tonen, daarna versturen: de echo bevestigt of de timeout rolt terug
+            self._optimistic_state = state
+            self.coordinator.expect_state(key, 1 if state else 0, self._rollback)
+            self.async_write_ha_state()
+
+        sent = await self.coordinator.async_set_relay(self._address, state)
+        if optimistic and not sent:
+            self.coordinator.cancel_expectation(key)
+            self._rollback()
+
+    @callback
+    def _rollback(self) -> None:
+        self._optimistic_state = None
+        self.async_write_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
+        self._optimistic_state = None
         self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.add_listener(
+                f"relay_{self._address}", self._handle_coordinator_update, throttle=True
+            )
+        )
         self.async_on_remove(
-            self.coordinator.add_listener(f"relay_{self._address}", self._handle_coordinator_update)
+            lambda: self.coordinator.cancel_expectation(f"relay_{self._address}")
         )
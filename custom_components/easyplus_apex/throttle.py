@@ -0,0 +1,42 @@
+"""Rate limiting van state writes met leading en trailing edge."""
+import asyncio
+from collections.abc import Callable
+
+
+class Throttle:
+    """Roept `func` hoogstens één keer per `interval` seconden aan.
+
+    De eerste aanroep gaat direct door (leading edge). Aanroepen binnen het
+    interval worden samengevoegd tot één aanroep aan het einde ervan
+    (trailing edge), zodat de laatste waarde altijd geschreven wordt.
+    """
+
+    __slots__ = ("_loop", "_interval", "_func", "_last", "_handle")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float, func: Callable[[], None]) -> None:
+        self._loop = loop
+        self._interval = interval
+        self._func = func
+        self._last = float("-inf")
+        self._handle: asyncio.TimerHandle | None = None
+
+    def __call__(self) -> None:
+        if self._handle is not None:
+            return
+        now = self._loop.time()
+        due = self._last + self._interval
+        if now >= due:
+            self._last = now
+            self._func()
+        else:
+            self._handle = self._loop.call_at(due, self._fire)
+
+    def _fire(self) -> None:
+        self._handle = None
+        self._last = self._loop.time()
+        self._func()
+
+    def cancel(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
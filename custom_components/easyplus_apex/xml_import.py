@@ -0,0 +1,102 @@
+"""XML import (config.xml uit de Easyplus software) voor de Easyplus Apex integratie."""
+import logging
+import re
+import xml.etree.ElementTree as ET
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    CONF_XML_CONTENT, CONF_COVERS, CONF_NAMING_MAP,
+    CONF_XML_SWITCHES, CONF_XML_DIMMERS, CONF_XML_INPUTS,
+    CONF_COVER_NAME, CONF_ADDR_DIR, CONF_ADDR_POWER,
+    CONF_TRAVEL_TIME, CONF_STRICT_MODE
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Regex om "rommel" namen te herkennen uit de XML
+JUNK_NAME_PATTERN = re.compile(r"^(Re \+\d+|relay \d+|Ch \d+|In \d+|\d+)$", re.IGNORECASE)
+
+def apply_xml_config(options: dict, xml_content: str) -> dict:
+    """Parse de XML, filter rommel, en scheid Switches van Dimmers (zonder dubbels).
+
+    Geeft een nieuwe options dict terug; gooit XmlImportError bij ongeldige XML.
+    """
+    new_options = dict(options)
+    new_options.pop(CONF_XML_CONTENT, None)
+    
+    naming_map = {}
+    covers = []
+    
+    # AANGEPAST: Gebruik 'set' in plaats van 'list' om dubbele adressen te voorkomen
+    valid_switches = set()
+    valid_dimmers = set()
+    valid_inputs = set()
+    
+    try:
+        root = ET.fromstring(xml_content)
+        
+        for item in root.iter():
+            if item.tag not in ['digout', 'dim', 'digin']:
+                continue
+
+            try:
+                address = int(item.get('adr'))
+                raw_name = item.get('name', "")
+                name = raw_name.strip()
+                item_type = item.get('type') # light, dimmer, shutter
+                tag = item.tag # 'dim', 'digout' of 'digin'
+
+                if not name: continue
+
+                # FILTER: Is het rommel?
+                is_junk = JUNK_NAME_PATTERN.match(name)
+                
+                # Uitzondering: Rolluiken mogen rommel-namen hebben
+                if is_junk and item_type != 'shutter':
+                    continue
+
+                # Ingangen delen de adresruimte niet met uitgangen
+                if tag == 'digin':
+                    naming_map[f"in_{address}"] = name
+                    valid_inputs.add(address)
+                    continue
+
+                naming_map[str(address)] = name
+
+                if item_type == 'shutter':
+                    # Rolluiken checken we handmatig op dubbels in de lijst
+                    # (Sets werken niet direct met dicts, dus eenvoudige check)
+                    existing_ids = [c[CONF_ADDR_DIR] for c in covers]
+                    if address not in existing_ids:
+                        covers.append({
+                            CONF_COVER_NAME: name,
+                            CONF_ADDR_DIR: address,
+                            CONF_ADDR_POWER: address + 1,
+                            CONF_TRAVEL_TIME: 25.0,
+                            "origin": "xml"
+                        })
+                elif tag == 'dim':
+                    valid_dimmers.add(address) # .add() voor sets
+                elif tag == 'digout':
+                    valid_switches.add(address) # .add() voor sets
+                        
+            except (ValueError, TypeError):
+                continue
+
+        new_options[CONF_NAMING_MAP] = naming_map
+        new_options[CONF_COVERS] = covers
+        # AANGEPAST: Converteer sets terug naar lijsten voor opslag in JSON
+        new_options[CONF_XML_SWITCHES] = list(valid_switches)
+        new_options[CONF_XML_DIMMERS] = list(valid_dimmers)
+        new_options[CONF_XML_INPUTS] = list(valid_inputs)
+        new_options[CONF_STRICT_MODE] = True
+
+        _LOGGER.info(f"XML Import: {len(valid_switches)} switches, {len(valid_dimmers)} dimmers, {len(valid_inputs)} inputs, {len(covers)} covers.")
+        return new_options
+
+    except ET.ParseError as err:
+        raise XmlImportError(f"Could not parse XML: {err}") from err
+
+
+class XmlImportError(HomeAssistantError): pass